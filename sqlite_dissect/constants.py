@@ -24,7 +24,7 @@ class Enum(MutableMapping):
         if isinstance(data, list):
             self._store = {value: value for value in data}
         elif isinstance(data, dict):
-            self._store = data
+            self._store = dict(data)
         else:
             log_message = (
                 f"Unable to initialize enumeration for: {data} with type: {type(data)}."
@@ -32,6 +32,18 @@ class Enum(MutableMapping):
             getLogger(LOGGER_NAME).error(log_message)
             raise ValueError(log_message)
 
+        """
+
+        The members are also set as attributes on the instance so accessing them as attributes (ie. PAGE_TYPE.X) is
+        a normal attribute lookup rather than falling through to __getattr__ after the lookup fails.  Members that are
+        not strings, begin with an underscore, or have the same name as an attribute of the class are left to
+        __getattr__ and item access.
+
+        """
+
+        for key, value in self._store.items():
+            self._set_member_attribute(key, value)
+
     def __getattr__(self, key):
         return self._store[key]
 
@@ -40,9 +52,11 @@ class Enum(MutableMapping):
 
     def __setitem__(self, key, value):
         self._store[key] = value
+        self._set_member_attribute(key, value)
 
     def __delitem__(self, key):
         del self._store[key]
+        self.__dict__.pop(key, None)
 
     def __contains__(self, key):
         return True if key in self._store else False
@@ -53,6 +67,10 @@ class Enum(MutableMapping):
     def __len__(self):
         return len(self._store)
 
+    def _set_member_attribute(self, key, value):
+        if isinstance(key, str) and not key.startswith("_") and not hasattr(Enum, key):
+            self.__dict__[key] = value
+
 
 UTF_8 = "utf-8"
 UTF_16BE = "utf-16-be"
@@ -73,6 +91,9 @@ TABLE_INTERIOR_PAGE_HEX_ID = b"\x05"
 INDEX_LEAF_PAGE_HEX_ID = b"\x0a"
 INDEX_INTERIOR_PAGE_HEX_ID = b"\x02"
 
+# The master page hex id as an integer to compare against a single indexed byte of a page
+MASTER_PAGE_FIRST_BYTE = MASTER_PAGE_HEX_ID[0]
+
 PAGE_TYPE = Enum(
     [
         "LOCK_BYTE",
@@ -120,6 +141,7 @@ HUMAN_READABLE_DATABASE_TEXT_ENCODINGS = {
     UTF_16BE_DATABASE_TEXT_ENCODING: "UTF-16be",
     UTF_16LE_DATABASE_TEXT_ENCODING: "UTF-16le",
 }
+# No longer used internally since the reserved for expansion space is checked for zero bytes directly
 RESERVED_FOR_EXPANSION_REGEX = "^0{40}$"
 
 FREELIST_NEXT_TRUNK_PAGE_LENGTH = 4
@@ -181,6 +203,7 @@ BLOB_SIGNATURE_IDENTIFIER = -1
 TEXT_SIGNATURE_IDENTIFIER = -2
 
 ZERO_BYTE = b"\x00"
+# No longer used internally since has_content checks the bytes for any non-zero byte directly
 ALL_ZEROS_REGEX = b"^0*$"
 
 SQLITE_MASTER_SCHEMA_ROOT_PAGE = 1
@@ -345,6 +368,14 @@ The types of output that are supported by this package.
 """
 EXPORT_TYPES = Enum(["TEXT", "CSV", "SQLITE", "XLSX", "CASE"])
 
+"""
+
+The buffer size used when opening export files for writing.  A larger buffer than the default reduces the number of
+write system calls made on large exports.
+
+"""
+EXPORT_FILE_BUFFER_SIZE = 1048576
+
 """
 Defines the list of common SQLite3 file extensions for initial identification of files to dissect for the bulk processing.
 """
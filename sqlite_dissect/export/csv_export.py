@@ -1,10 +1,13 @@
 import os
+from codecs import getdecoder
 from csv import QUOTE_ALL, writer
+from itertools import chain, repeat
 from logging import DEBUG, getLogger
+from operator import attrgetter
 from os.path import basename, normpath, sep
-from re import sub
 
 from sqlite_dissect.constants import (
+    EXPORT_FILE_BUFFER_SIZE,
     ILLEGAL_XML_CHARACTER_PATTERN,
     LOGGER_NAME,
     MASTER_SCHEMA_ROW_TYPE,
@@ -69,7 +72,12 @@ class VersionCsvExporter:
 
                 logger.info(f"Writing CSV file: {csv_file_name}.")
 
-                with open(csv_file_name, "wb") as csv_file_handle:
+                with open(
+                    csv_file_name,
+                    "w",
+                    newline="",
+                    buffering=EXPORT_FILE_BUFFER_SIZE,
+                ) as csv_file_handle:
 
                     csv_writer = writer(
                         csv_file_handle, delimiter=",", quotechar='"', quoting=QUOTE_ALL
@@ -165,15 +173,13 @@ class VersionCsvExporter:
     ):
         """
 
-        This function will write the list of cells sent in to the sheet specified including the metadata regarding
+        This function will write the list of cells sent in to the csv writer specified including the metadata regarding
         to the file type, page type, and operation.
 
         Note:  The types of the data in the values can prove to be an issue here.  We want to write the value out as
-               a string similarly as the text and csv outputs do for example even though it may contain invalid
-               characters.  When data is sent into the openpyxl library to be written to the xml xlsx, if it is a
-               string, it is encoded into the default encoding and then checked for xml illegal characters that may
-               pose an issue when written to the xml.  In order to properly check the values and write them accordingly
-               through the openpyxl library we address the following use cases for the value in order:
+               a string similarly as the text output does for example even though it may contain invalid characters.
+               In order to properly check the values and write them accordingly through the csv writer we address the
+               following use cases for the value in order:
                1.)  If the value is None, we replace the value with the string "NULL".  This might be replaced by
                     leaving it None but issues can be seen when carving cells where the value is None not because it
                     was NULL originally in the database, but because it was unable to be parsed out when it may have
@@ -181,8 +187,7 @@ class VersionCsvExporter:
                2.)  If the value is a bytearray (most likely originally a blob object) or a string value, we want to
                     write the value as a string.  However, in order to do this for blob objects or strings that may
                     have a few bad characters in them from carving, we need to do our due diligence and make sure
-                    there are no bad unicode characters and no xml illegal characters that may cause issues with
-                    writing to the xlsx.  In order to do this we do the following:
+                    there are no bad unicode characters.  In order to do this we do the following:
                     a.)  We first convert the value to string if the affinity was not text, otherwise we decode
                          the value in the database text encoding.  When we decode using the database text encoding,
                          we specify to "replace" characters it does not recognize in order to compensate for carved
@@ -193,27 +198,13 @@ class VersionCsvExporter:
                                string that need to be addressed.  In order to escape these, we decode the string
                                as UTF-8 using the "replace" method to replace any illegal unicode characters
                                with '\ufffd' and set this back as the value after encoding again.
-                    c.)  After we have successfully set the value back to a UTF-8 compliant value, we need to check
-                         the value for xml illegal characters.  If any of these xml illegal characters are found,
-                         they are replaced with a space.  This behaviour may be different from how values are output
-                         into text or csv since this is being written to xml and additional rules apply for certain
-                         characters.
-                         between the xlsx output and text/csv output in reference to xml illegal characters.
-                    d.)  After all the illegal characters are removed, due to the way openpyxl determines data types
-                         of particular cells, if a cell starts with "=", it is determined to be a formula and set as
-                         that in the data type field for that cell.  This causes issues when opening the file in excel.
-                         Microsoft Excel recommends prefacing the string with a single quote character, however,
-                         this only seems to be within Excel itself.  You can specify the data type of the cell in
-                         openpyxl, but not in the write-only mode that is being used here.  In order to work around
-                         this, we check if the first character of a string or bytearray is a "=" character and preface
-                         that string with a space.  There may be better ways to handle this such as not using the
-                         write-only mode.
-                         Note:  Additionally to the "=" character, the "-" character has similar issues in excel.
-                                However, openpyxl explicitly checks on the "=" character being the first character
-                                and setting that cell to a formula and does not handle the use case of a cell starting
-                                with the "-" character, so this use case is ignored.
+                    c.)  If the value starts with "=", it is prefaced with a space.  Spreadsheet applications such
+                         as Excel or LibreOffice will otherwise evaluate the value as a formula when the csv is
+                         opened, which allows formula injection from data recovered out of the database.
+                    d.)  Any NUL, C0 control or other xml illegal characters are replaced with a space.  These
+                         characters are commonly found in carved values and cause issues with many csv readers.
                3.)  If the value does not fall in one of the above use cases, we leave it as is and write it to the
-                    xlsx without any modifications.
+                    csv without any modifications.
 
         Note:  It was noticed that blob objects are typically detected as isinstance of str here and strings are
                bytearray objects.  This needs to be investigated why exactly blob objects are coming out as str
@@ -277,16 +268,17 @@ class VersionCsvExporter:
 
         csv_writer.writerow(column_headers)
 
+        record_column_fields = attrgetter("serial_type", "value")
+        replace_illegal_xml_characters = ILLEGAL_XML_CHARACTER_PATTERN.sub
+
         for cell in cells.values():
 
             cell_record_column_values = []
 
-            for record_column in cell.payload.record_columns:
-                serial_type = record_column.serial_type
-                text_affinity = (
-                    True if serial_type >= 13 and serial_type % 2 == 1 else False
-                )
-                value = record_column.value
+            for serial_type, value in map(
+                record_column_fields, cell.payload.record_columns
+            ):
+                text_affinity = serial_type >= 13 and serial_type & 1
                 if isinstance(value, (bytes, bytearray, str)):
                     value = (
                         value.decode(version.database_text_encoding, "replace")
@@ -299,9 +291,9 @@ class VersionCsvExporter:
                         value = value.decode(UTF_8, "replace").encode(UTF_8)
                     if not isinstance(value, str):
                         value = value.decode(UTF_8)
-                    if value[0] == "=":
+                    if value.startswith("="):
                         value = " " + value
-                    value = sub(ILLEGAL_XML_CHARACTER_PATTERN, " ", value)
+                    value = replace_illegal_xml_characters(" ", value)
                 cell_record_column_values.append(value)
 
             row = [
@@ -352,15 +344,13 @@ class VersionCsvExporter:
     ):
         """
 
-        This function will write the list of cells sent in to the sheet specified including the metadata regarding
+        This function will write the list of cells sent in to the csv writer specified including the metadata regarding
         to the file type, page type, and operation.
 
         Note:  The types of the data in the values can prove to be an issue here.  We want to write the value out as
-               a string similarly as the text and csv outputs do for example even though it may contain invalid
-               characters.  When data is sent into the openpyxl library to be written to the xml xlsx, if it is a
-               string, it is encoded into the default encoding and then checked for xml illegal characters that may
-               pose an issue when written to the xml.  In order to properly check the values and write them accordingly
-               through the openpyxl library we address the following use cases for the value in order:
+               a string similarly as the text output does for example even though it may contain invalid characters.
+               In order to properly check the values and write them accordingly through the csv writer we address the
+               following use cases for the value in order:
                1.)  If the value is None, we replace the value with the string "NULL".  This might be replaced by
                     leaving it None but issues can be seen when carving cells where the value is None not because it
                     was NULL originally in the database, but because it was unable to be parsed out when it may have
@@ -368,8 +358,7 @@ class VersionCsvExporter:
                2.)  If the value is a bytearray (most likely originally a blob object) or a string value, we want to
                     write the value as a string.  However, in order to do this for blob objects or strings that may
                     have a few bad characters in them from carving, we need to do our due diligence and make sure
-                    there are no bad unicode characters and no xml illegal characters that may cause issues with
-                    writing to the xlsx.  In order to do this we do the following:
+                    there are no bad unicode characters.  In order to do this we do the following:
                     a.)  We first convert the value to string if the affinity was not text, otherwise we decode
                          the value in the database text encoding.  When we decode using the database text encoding,
                          we specify to "replace" characters it does not recognize in order to compensate for carved
@@ -380,27 +369,13 @@ class VersionCsvExporter:
                                string that need to be addressed.  In order to escape these, we decode the string
                                as UTF-8 using the "replace" method to replace any illegal unicode characters
                                with '\ufffd' and set this back as the value after encoding again.
-                    c.)  After we have successfully set the value back to a UTF-8 compliant value, we need to check
-                         the value for xml illegal characters.  If any of these xml illegal characters are found,
-                         they are replaced with a space.  This behaviour may be different from how values are output
-                         into text or csv since this is being written to xml and additional rules apply for certain
-                         characters.
-                         between the xlsx output and text/csv output in reference to xml illegal characters.
-                    d.)  After all the illegal characters are removed, due to the way openpyxl determines data types
-                         of particular cells, if a cell starts with "=", it is determined to be a formula and set as
-                         that in the data type field for that cell.  This causes issues when opening the file in excel.
-                         Microsoft Excel recommends prefacing the string with a single quote character, however,
-                         this only seems to be within Excel itself.  You can specify the data type of the cell in
-                         openpyxl, but not in the write-only mode that is being used here.  In order to work around
-                         this, we check if the first character of a string or bytearray is a "=" character and preface
-                         that string with a space.  There may be better ways to handle this such as not using the
-                         write-only mode.
-                         Note:  Additionally to the "=" character, the "-" character has similar issues in excel.
-                                However, openpyxl explicitly checks on the "=" character being the first character
-                                and setting that cell to a formula and does not handle the use case of a cell starting
-                                with the "-" character, so this use case is ignored.
+                    c.)  If the value starts with "=", it is prefaced with a space.  Spreadsheet applications such
+                         as Excel or LibreOffice will otherwise evaluate the value as a formula when the csv is
+                         opened, which allows formula injection from data recovered out of the database.
+                    d.)  Any NUL, C0 control or other xml illegal characters are replaced with a space.  These
+                         characters are commonly found in carved values and cause issues with many csv readers.
                3.)  If the value does not fall in one of the above use cases, we leave it as is and write it to the
-                    xlsx without any modifications.
+                    csv without any modifications.
 
         Note:  It was noticed that blob objects are typically detected as isinstance of str here and strings are
                bytearray objects.  This needs to be investigated why exactly blob objects are coming out as str
@@ -455,30 +430,27 @@ class VersionCsvExporter:
             ]
         )
         column_headers.extend(
-            [
-                column_definition.column_name
-                for column_definition in master_schema_entry.column_definitions
-            ]
+            column_definition.column_name
+            for column_definition in master_schema_entry.column_definitions
         )
 
         logger.debug("Column Headers: {}".format(" , ".join(column_headers)))
 
         csv_writer.writerow(column_headers)
 
-        sorted_cells = sorted(
-            cells.values(), key=lambda b_tree_cell: b_tree_cell.row_id
-        )
+        sorted_cells = sorted(cells.values(), key=attrgetter("row_id"))
+
+        record_column_fields = attrgetter("serial_type", "value")
+        replace_illegal_xml_characters = ILLEGAL_XML_CHARACTER_PATTERN.sub
 
         for cell in sorted_cells:
 
             cell_record_column_values = []
 
-            for record_column in cell.payload.record_columns:
-                serial_type = record_column.serial_type
-                text_affinity = (
-                    True if serial_type >= 13 and serial_type % 2 == 1 else False
-                )
-                value = record_column.value
+            for serial_type, value in map(
+                record_column_fields, cell.payload.record_columns
+            ):
+                text_affinity = serial_type >= 13 and serial_type & 1
                 if isinstance(value, (bytes, bytearray, str)):
                     value = (
                         value.decode(version.database_text_encoding, "replace")
@@ -491,9 +463,9 @@ class VersionCsvExporter:
                         value = value.decode(UTF_8, "replace").encode(UTF_8)
                     if not isinstance(value, str):
                         value = value.decode(UTF_8)
-                    if value[0] == "=":
+                    if value.startswith("="):
                         value = " " + value
-                    value = sub(ILLEGAL_XML_CHARACTER_PATTERN, " ", value)
+                    value = replace_illegal_xml_characters(" ", value)
                 cell_record_column_values.append(value)
 
             row = [
@@ -547,16 +519,17 @@ class VersionCsvExporter:
 
         logger = getLogger(LOGGER_NAME)
 
+        record_column_fields = attrgetter("serial_type", "value")
+        replace_illegal_xml_characters = ILLEGAL_XML_CHARACTER_PATTERN.sub
+
         for carved_cell in carved_cells:
 
             cell_record_column_values = []
 
-            for record_column in carved_cell.payload.record_columns:
-                serial_type = record_column.serial_type
-                text_affinity = (
-                    True if serial_type >= 13 and serial_type % 2 == 1 else False
-                )
-                value = record_column.value
+            for serial_type, value in map(
+                record_column_fields, carved_cell.payload.record_columns
+            ):
+                text_affinity = serial_type >= 13 and serial_type & 1
                 if isinstance(value, (bytes, bytearray, str)):
                     value = (
                         value.decode(version.database_text_encoding, "replace")
@@ -569,9 +542,9 @@ class VersionCsvExporter:
                         value = value.decode(UTF_8, "replace").encode(UTF_8)
                     if not isinstance(value, str):
                         value = value.decode(UTF_8)
-                    if value[0] == "=":
+                    if value.startswith("="):
                         value = " " + value
-                    value = sub(ILLEGAL_XML_CHARACTER_PATTERN, " ", value)
+                    value = replace_illegal_xml_characters(" ", value)
                 cell_record_column_values.append(value)
 
             row = [
@@ -658,7 +631,9 @@ class CommitCsvExporter:
             self._csv_file_names[commit.name] = csv_file_name
             write_headers = True
 
-        with open(csv_file_name, mode, newline="") as csv_file_handle:
+        with open(
+            csv_file_name, mode, newline="", buffering=EXPORT_FILE_BUFFER_SIZE
+        ) as csv_file_handle:
 
             csv_writer = writer(
                 csv_file_handle, delimiter=",", quotechar='"', quoting=QUOTE_ALL
@@ -713,32 +688,12 @@ class CommitCsvExporter:
                     commit.file_type,
                     commit.database_text_encoding,
                     commit.page_type,
-                    commit.added_cells.values(),
-                    "Added",
-                )
-                CommitCsvExporter._write_cells(
-                    csv_writer,
-                    commit.file_type,
-                    commit.database_text_encoding,
-                    commit.page_type,
-                    commit.updated_cells.values(),
-                    "Updated",
-                )
-                CommitCsvExporter._write_cells(
-                    csv_writer,
-                    commit.file_type,
-                    commit.database_text_encoding,
-                    commit.page_type,
-                    commit.deleted_cells.values(),
-                    "Deleted",
-                )
-                CommitCsvExporter._write_cells(
-                    csv_writer,
-                    commit.file_type,
-                    commit.database_text_encoding,
-                    commit.page_type,
-                    commit.carved_cells.values(),
-                    "Carved",
+                    chain(
+                        zip(commit.added_cells.values(), repeat("Added")),
+                        zip(commit.updated_cells.values(), repeat("Updated")),
+                        zip(commit.deleted_cells.values(), repeat("Deleted")),
+                        zip(commit.carved_cells.values(), repeat("Carved")),
+                    ),
                 )
 
             elif (
@@ -749,10 +704,8 @@ class CommitCsvExporter:
                 if write_headers:
                     column_headers.append("Row ID")
                     column_headers.extend(
-                        [
-                            column_definition.column_name
-                            for column_definition in master_schema_entry.column_definitions
-                        ]
+                        column_definition.column_name
+                        for column_definition in master_schema_entry.column_definitions
                     )
                     if isinstance(column_headers, str):
                         csv_writer.writerow([column_headers])
@@ -760,42 +713,10 @@ class CommitCsvExporter:
                         csv_writer.writerow(column_headers)
 
                 # Sort the added, updated, and deleted cells by the row id
-                sorted_added_cells = sorted(
-                    commit.added_cells.values(),
-                    key=lambda b_tree_cell: b_tree_cell.row_id,
-                )
-                CommitCsvExporter._write_cells(
-                    csv_writer,
-                    commit.file_type,
-                    commit.database_text_encoding,
-                    commit.page_type,
-                    sorted_added_cells,
-                    "Added",
-                )
-                sorted_updated_cells = sorted(
-                    commit.updated_cells.values(),
-                    key=lambda b_tree_cell: b_tree_cell.row_id,
-                )
-                CommitCsvExporter._write_cells(
-                    csv_writer,
-                    commit.file_type,
-                    commit.database_text_encoding,
-                    commit.page_type,
-                    sorted_updated_cells,
-                    "Updated",
-                )
-                sorted_deleted_cells = sorted(
-                    commit.deleted_cells.values(),
-                    key=lambda b_tree_cell: b_tree_cell.row_id,
-                )
-                CommitCsvExporter._write_cells(
-                    csv_writer,
-                    commit.file_type,
-                    commit.database_text_encoding,
-                    commit.page_type,
-                    sorted_deleted_cells,
-                    "Deleted",
-                )
+                row_id = attrgetter("row_id")
+                sorted_added_cells = sorted(commit.added_cells.values(), key=row_id)
+                sorted_updated_cells = sorted(commit.updated_cells.values(), key=row_id)
+                sorted_deleted_cells = sorted(commit.deleted_cells.values(), key=row_id)
 
                 # We will not sort the carved cells since row ids are not deterministic even if parsed
                 CommitCsvExporter._write_cells(
@@ -803,8 +724,12 @@ class CommitCsvExporter:
                     commit.file_type,
                     commit.database_text_encoding,
                     commit.page_type,
-                    commit.carved_cells.values(),
-                    "Carved",
+                    chain(
+                        zip(sorted_added_cells, repeat("Added")),
+                        zip(sorted_updated_cells, repeat("Updated")),
+                        zip(sorted_deleted_cells, repeat("Deleted")),
+                        zip(commit.carved_cells.values(), repeat("Carved")),
+                    ),
                 )
 
             else:
@@ -820,56 +745,35 @@ class CommitCsvExporter:
                 raise ExportError(log_message)
 
     @staticmethod
-    def _write_cells(
-        csv_writer, file_type, database_text_encoding, page_type, cells, operation
-    ):
+    def _write_cells(csv_writer, file_type, database_text_encoding, page_type, cells):
         """
 
-        This function will write the list of cells sent in to the sheet specified including the metadata regarding
-        to the file type, page type, and operation.
+        This function will write the list of cells sent in to the csv writer specified including the metadata regarding
+        to the file type, page type, and operation.  The cells are sent in as (cell, operation) pairs so all of the
+        operations for a commit can be written in a single call.
 
         Note:  The types of the data in the values can prove to be an issue here.  We want to write the value out as
-               a string similarly as the text and csv outputs do for example even though it may contain invalid
-               characters.  When data is sent into the openpyxl library to be written to the xml xlsx, if it is a
-               string, it is encoded into the default encoding and then checked for xml illegal characters that may
-               pose an issue when written to the xml.  In order to properly check the values and write them accordingly
-               through the openpyxl library we address the following use cases for the value in order:
+               a string similarly as the text output does for example even though it may contain invalid characters.
+               In order to properly check the values and write them accordingly through the csv writer we address the
+               following use cases for the value in order:
                1.)  If the value is a bytearray (most likely originally a blob object) or a string value, we want to
                     write the value as a string.  However, in order to do this for blob objects or strings that may
                     have a few bad characters in them from carving, we need to do our due diligence and make sure
-                    there are no bad unicode characters and no xml illegal characters that may cause issues with
-                    writing to the xlsx.  In order to do this we do the following:
+                    there are no bad unicode characters.  In order to do this we do the following:
                     a.)  We first convert the value to string if the affinity was not text, otherwise we decode
                          the value in the database text encoding.  When we decode using the database text encoding,
                          we specify to "replace" characters it does not recognize in order to compensate for carved
                          rows.
-                    b.)  We then test encoding it to UTF-8.
-                         i.)   If the value successfully encodes as UTF-8 we set that as the value.
-                         ii.)  If the value throws an exception encoding, we have illegal unicode characters in the
-                               string that need to be addressed.  In order to escape these, we decode the string
-                               as UTF-8 using the "replace" method to replace any illegal unicode characters
-                               with '\ufffd' and set this back as the value after encoding again.
-                    c.)  After we have successfully set the value back to a UTF-8 compliant value, we need to check
-                         the value for xml illegal characters.  If any of these xml illegal characters are found,
-                         they are replaced with a space.  This behaviour may be different from how values are output
-                         into text or csv since this is being written to xml and additional rules apply for certain
-                         characters.
-                         between the xlsx output and text/csv output in reference to xml illegal characters.
-                    d.)  After all the illegal characters are removed, due to the way openpyxl determines data types
-                         of particular cells, if a cell starts with "=", it is determined to be a formula and set as
-                         that in the data type field for that cell.  This causes issues when opening the file in excel.
-                         Microsoft Excel recommends prefacing the string with a single quote character, however,
-                         this only seems to be within Excel itself.  You can specify the data type of the cell in
-                         openpyxl, but not in the write-only mode that is being used here.  In order to work around
-                         this, we check if the first character of a string or bytearray is a "=" character and preface
-                         that string with a space.  There may be better ways to handle this such as not using the
-                         write-only mode.
-                         Note:  Additionally to the "=" character, the "-" character has similar issues in excel.
-                                However, openpyxl explicitly checks on the "=" character being the first character
-                                and setting that cell to a formula and does not handle the use case of a cell starting
-                                with the "-" character, so this use case is ignored.
+                    b.)  Since text values are decoded using the "replace" method and the string form of any other
+                         value is ascii, the value is already valid unicode.  It is left to the file handle to encode
+                         when written rather than being encoded to UTF-8 and decoded back again here.
+                    c.)  If the value starts with "=", it is prefaced with a space.  Spreadsheet applications such
+                         as Excel or LibreOffice will otherwise evaluate the value as a formula when the csv is
+                         opened, which allows formula injection from data recovered out of the database.
+                    d.)  Any NUL, C0 control or other xml illegal characters are replaced with a space.  These
+                         characters are commonly found in carved values and cause issues with many csv readers.
                2.)  If the value does not fall in one of the above use cases, we leave it as is and write it to the
-                    xlsx without any modifications.
+                    csv without any modifications.
 
         Note:  If the value is None, we leave it as None.  We used to update the None value with the string "NULL"
                since issues could be seen when carving cells where the value is None not because it was NULL originally
@@ -890,49 +794,88 @@ class CommitCsvExporter:
         :param database_text_encoding:
         :param page_type:
         :param cells:
-        :param operation:
 
         :return:
 
         """
 
-        for cell in cells:
+        csv_writer.writerows(
+            CommitCsvExporter._get_cell_rows(
+                file_type, database_text_encoding, page_type, cells
+            )
+        )
 
-            cell_record_column_values = []
-            for record_column in cell.payload.record_columns:
-                serial_type = record_column.serial_type
-                text_affinity = (
-                    True if serial_type >= 13 and serial_type % 2 == 1 else False
-                )
-                value = record_column.value
-                if isinstance(value, (bytes, bytearray, str)):
+    @staticmethod
+    def _get_cell_rows(file_type, database_text_encoding, page_type, cells):
+        """
+
+        This function will generate the csv rows for the cells sent in including the metadata regarding the file
+        type, page type, and operation.  The rows are generated one at a time so they are written out by the csv
+        writer as they are built rather than being collected first.  See _write_cells for how the record column
+        values are converted.
+
+        :param file_type:
+        :param database_text_encoding:
+        :param page_type:
+        :param cells:
+
+        :return:
+
+        """
+
+        metadata_fields = [
+            "version_number",
+            "page_version_number",
+            "source",
+            "page_number",
+            "location",
+            "file_offset",
+        ]
+        if page_type == PAGE_TYPE.B_TREE_TABLE_LEAF:
+            metadata_fields.append("row_id")
+        cell_metadata = attrgetter(*metadata_fields)
+        record_column_fields = attrgetter("serial_type", "value")
+        replace_illegal_xml_characters = ILLEGAL_XML_CHARACTER_PATTERN.sub
+        decode_text = getdecoder(database_text_encoding)
+        string_types = (bytes, bytearray, str)
+
+        for cell, operation in cells:
+
+            (
+                version_number,
+                page_version_number,
+                source,
+                page_number,
+                location,
+                *file_offset_and_row_id,
+            ) = cell_metadata(cell)
+
+            row = [
+                file_type,
+                version_number,
+                page_version_number,
+                source,
+                page_number,
+                location,
+                operation,
+                *file_offset_and_row_id,
+            ]
+
+            # The record column values are appended straight onto the row to avoid building a second list per cell
+            append_value = row.append
+            for serial_type, value in map(
+                record_column_fields, cell.payload.record_columns
+            ):
+                text_affinity = serial_type >= 13 and serial_type & 1
+                if isinstance(value, string_types):
                     value = (
-                        value.decode(database_text_encoding, "replace")
+                        decode_text(value, "replace")[0]
                         if text_affinity
                         else str(value)
                     )
-                    try:
-                        value = value.encode(UTF_8)
-                    except UnicodeDecodeError:
-                        value = value.decode(UTF_8, "replace").encode(UTF_8)
-                    if not isinstance(value, str):
-                        value = value.decode(UTF_8)
-                    if value[0] == "=":
+                    if value.startswith("="):
                         value = " " + value
-                    value = sub(ILLEGAL_XML_CHARACTER_PATTERN, " ", value)
-                cell_record_column_values.append(value)
+                    value = replace_illegal_xml_characters(" ", value)
+                append_value(value)
 
-            row = [
-                file_type,
-                cell.version_number,
-                cell.page_version_number,
-                cell.source,
-                cell.page_number,
-                cell.location,
-                operation,
-                cell.file_offset,
-            ]
-            if page_type == PAGE_TYPE.B_TREE_TABLE_LEAF:
-                row.append(cell.row_id)
-            row.extend(cell_record_column_values)
-            csv_writer.writerow(row)
+            yield row
@@ -1,7 +1,10 @@
+from codecs import getdecoder
+from itertools import chain, repeat
 from logging import getLogger
+from operator import attrgetter
 from os import rename
-from os.path import exists, sep
-from sqlite3 import connect, sqlite_version, version
+from os.path import sep
+from sqlite3 import DatabaseError, connect, sqlite_version, version
 from uuid import uuid4
 
 from sqlite_dissect.constants import LOGGER_NAME, PAGE_TYPE
@@ -24,6 +27,10 @@ CommitSqliteExporter(object)
 
 
 class CommitSqliteExporter:
+
+    # The number of commit records written between each commit to the SQLite file
+    _COMMIT_INTERVAL = 512
+
     def __init__(self, export_directory, file_name):
         """
 
@@ -32,16 +39,22 @@ class CommitSqliteExporter:
         The master schema entries created tables dictionary will hold the names of the created tables in the SQLite
         file being written to so consecutive writes to those tables will be able to tell if the table was already
         created or not.  The reason it is a dictionary and not just a list of names is that the value keyed off the
-        master schema name will be the number of columns in that table.  This is needed since different rows within
-        the same table may have a different number of columns in the case that the table was altered and columns were
-        added at some point.  This way the number of columns can be specified and values that may be missing can be
-        specified as being left NULL.
+        master schema name will be a tuple of the number of columns in that table and the insert statement for it.
+        The number of columns is needed since different rows within the same table may have a different number of
+        columns in the case that the table was altered and columns were added at some point.  This way the number of
+        columns can be specified and values that may be missing can be specified as being left NULL.  The insert
+        statement is built once when the table is created so it does not need to be rebuilt on every write.
 
         Note:  According to documentation, it appears only tables can be altered.  However, we include the same logic
                with the number of rows for both tables and indexes for consistency and code reduction.
 
         Note:  If the file is detected as already existing, a uuid will be appended to the file name of the old file
-               and a new file by the name specified will be created.
+               and a new file by the name specified will be created.  The existing file is detected by attempting
+               to rename it rather than checking if it exists first and then renaming it in a separate step.
+
+        Note:  Rather than committing after every commit record written, the written commit records are committed
+               to the SQLite file once the commit interval number of them have been written, and again when the
+               exporter is exited.  This reduces the number of times the SQLite file is synced to disk.
 
         :param export_directory:
         :param file_name:
@@ -52,21 +65,21 @@ class CommitSqliteExporter:
 
         self._sqlite_file_name = export_directory + sep + file_name
         self._connection = None
+        self._cursor = None
         self._master_schema_entries_created_tables = {}
+        self._uncommitted_writes = 0
 
     def __enter__(self):
 
-        # Check if the file exists and if it does rename it
-        if exists(self._sqlite_file_name):
-
-            # Generate a uuid to append to the file name
-            new_file_name_for_existing_file = (
-                self._sqlite_file_name + "-" + str(uuid4())
-            )
+        # Generate a uuid to append to the file name in case the file already exists
+        new_file_name_for_existing_file = self._sqlite_file_name + "-" + str(uuid4())
 
-            # Rename the existing file
+        # Rename the existing file if there is one rather than checking if it exists first
+        try:
             rename(self._sqlite_file_name, new_file_name_for_existing_file)
-
+        except FileNotFoundError:
+            pass
+        else:
             log_message = (
                 "File: {} already existing when creating the file for commit sqlite exporting.  The "
                 "file was renamed to: {} and new data will be written to the file name specified."
@@ -76,7 +89,7 @@ class CommitSqliteExporter:
             )
             getLogger(LOGGER_NAME).debug(log_message)
 
-        self._connection = connect(self._sqlite_file_name)
+        self._connection = connect(self._sqlite_file_name, isolation_level=None)
         log_message = (
             "Opened connection to {} using sqlite version: {} and pysqlite version: {}"
         )
@@ -84,10 +97,69 @@ class CommitSqliteExporter:
             self._sqlite_file_name, sqlite_version, version
         )
         getLogger(LOGGER_NAME).debug(log_message)
+
+        """
+
+        Since the exporter is the only writer to the SQLite file and only ever writes to it, the connection is tuned
+        for bulk writing.  The rollback journal is kept in memory rather than written out to a separate file, normal
+        synchronization is used, temporary objects are kept in memory, a larger page cache is used, and the file is
+        held with an exclusive lock so the lock does not need to be acquired again for every transaction.
+
+        Note:  Write-ahead logging is not used since the journal mode of write-ahead logging is persistent and would
+               be left set in the exported SQLite file.  The in memory journal mode only applies to this connection
+               so the exported file is left in the default rollback journal mode.
+
+        Note:  If any of these pragmas are not supported by the SQLite version in use, the defaults are left in place.
+
+        """
+
+        try:
+            self._connection.executescript(
+                "PRAGMA journal_mode=MEMORY;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA temp_store=MEMORY;"
+                "PRAGMA cache_size=-65536;"
+                "PRAGMA locking_mode=EXCLUSIVE;"
+            )
+        except DatabaseError as error:
+            log_message = "Unable to set the pragmas on the connection to {}: {}"
+            log_message = log_message.format(self._sqlite_file_name, error)
+            getLogger(LOGGER_NAME).warning(log_message)
+
+        # A single cursor is used for all of the statements executed rather than one being created for every call
+        self._cursor = self._connection.cursor()
+
+        """
+
+        The connection is opened with an isolation level of None so transactions are managed here rather than being
+        implicitly started before each insert.  Each transaction is started with "BEGIN IMMEDIATE" in order to take
+        the reserved lock up front instead of escalating to it on the first write of every batch.
+
+        """
+
+        self._cursor.execute("BEGIN IMMEDIATE")
+
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self._connection.close()
+        """
+
+        Only commit the remaining writes if the exporter exited cleanly, otherwise roll back the partial batch.
+
+        Note:  A transaction may not be open if starting the next batch failed after the previous batch was
+               committed.  Neither statement is run in that case so the original exception is not replaced.
+
+        """
+
+        try:
+            if self._connection.in_transaction:
+                if exc_type is None:
+                    self._cursor.execute("COMMIT")
+                else:
+                    self._cursor.execute("ROLLBACK")
+        finally:
+            self._cursor.close()
+            self._connection.close()
         log_message = (
             "Closed connection to {} using sqlite version: {} and pysqlite version: {}"
         )
@@ -117,8 +189,6 @@ class CommitSqliteExporter:
         if not commit.updated:
             return
 
-        logger = getLogger(LOGGER_NAME)
-
         # Check if the master schema entry name is a internal schema object and if so preface it with "iso_"
         internal_schema_object = (
             master_schema_entry.internal_schema_object
@@ -179,33 +249,34 @@ class CommitSqliteExporter:
 
                 """
 
-                cells = list()
-                cells.extend(commit.added_cells.values())
-                cells.extend(commit.updated_cells.values())
-                cells.extend(commit.deleted_cells.values())
-                cells.extend(commit.carved_cells.values())
+                # Only the first cell is needed to find the number of columns so the cells are not collected
+                first_cell = next(
+                    chain(
+                        commit.added_cells.values(),
+                        commit.updated_cells.values(),
+                        commit.deleted_cells.values(),
+                        commit.carved_cells.values(),
+                    ),
+                    None,
+                )
 
-                if len(cells) < 1:
+                if first_cell is None:
                     log_message = (
                         "Found invalid number of cells in commit when specified updated: {} "
                         "found for sqlite export on master schema entry name: {} page type: {} "
                         "while writing to sqlite file name: {}."
                     )
                     log_message = log_message.format(
-                        len(cells),
+                        0,
                         commit.name,
                         commit.page_type,
                         self._sqlite_file_name,
                     )
-                    logger.warning(log_message)
+                    getLogger(LOGGER_NAME).warning(log_message)
                     raise ExportError(log_message)
 
-                number_of_columns = len(cells[0].payload.record_columns)
-                index_column_headers = []
-                for i in range(number_of_columns):
-                    index_column_headers.append(f"Column {i}")
-
-                column_headers.extend(index_column_headers)
+                number_of_columns = len(first_cell.payload.record_columns)
+                column_headers.extend(f"Column {i}" for i in range(number_of_columns))
                 column_headers = [
                     column_header.replace(" ", "_").lower()
                     for column_header in column_headers
@@ -226,12 +297,13 @@ class CommitSqliteExporter:
 
                 """
 
+                column_definition_names = set(column_definitions)
                 updated_column_headers = []
                 for column_header in column_headers:
                     updated_column_header_name = (
                         "sd_" + column_header.replace(" ", "_").lower()
                     )
-                    while updated_column_header_name in column_definitions:
+                    while updated_column_header_name in column_definition_names:
                         updated_column_header_name = "sd_" + updated_column_header_name
                     updated_column_headers.append(updated_column_header_name)
 
@@ -247,18 +319,24 @@ class CommitSqliteExporter:
                 log_message = log_message.format(
                     commit.page_type, commit.name, self._sqlite_file_name
                 )
-                logger.warning(log_message)
+                getLogger(LOGGER_NAME).warning(log_message)
                 raise ExportError(log_message)
 
             create_table_statement = "CREATE TABLE {} ({})"
             create_table_statement = create_table_statement.format(
-                table_name, " ,".join(column_headers)
+                table_name, ", ".join(column_headers)
+            )
+            self._cursor.execute(create_table_statement)
+
+            column_count = len(column_headers)
+            insert_statement = "INSERT INTO {} VALUES ({})"
+            insert_statement = insert_statement.format(
+                table_name, ", ".join(["?"] * column_count)
             )
-            self._connection.execute(create_table_statement)
-            self._connection.commit()
 
-            self._master_schema_entries_created_tables[master_schema_entry.name] = len(
-                column_headers
+            self._master_schema_entries_created_tables[master_schema_entry.name] = (
+                column_count,
+                insert_statement,
             )
 
         """
@@ -267,108 +345,51 @@ class CommitSqliteExporter:
 
         """
 
-        column_count = self._master_schema_entries_created_tables[
+        column_count, insert_statement = self._master_schema_entries_created_tables[
             master_schema_entry.name
         ]
 
         if commit.page_type == PAGE_TYPE.B_TREE_INDEX_LEAF:
 
             CommitSqliteExporter._write_cells(
-                self._connection,
-                table_name,
-                column_count,
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                commit.added_cells.values(),
-                "Added",
-            )
-            CommitSqliteExporter._write_cells(
-                self._connection,
+                self._cursor,
                 table_name,
                 column_count,
+                insert_statement,
                 commit.file_type,
                 commit.database_text_encoding,
                 commit.page_type,
-                commit.updated_cells.values(),
-                "Updated",
-            )
-            CommitSqliteExporter._write_cells(
-                self._connection,
-                table_name,
-                column_count,
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                commit.deleted_cells.values(),
-                "Deleted",
-            )
-            CommitSqliteExporter._write_cells(
-                self._connection,
-                table_name,
-                column_count,
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                commit.carved_cells.values(),
-                "Carved",
+                chain(
+                    zip(commit.added_cells.values(), repeat("Added")),
+                    zip(commit.updated_cells.values(), repeat("Updated")),
+                    zip(commit.deleted_cells.values(), repeat("Deleted")),
+                    zip(commit.carved_cells.values(), repeat("Carved")),
+                ),
             )
 
         elif commit.page_type == PAGE_TYPE.B_TREE_TABLE_LEAF:
 
             # Sort the added, updated, and deleted cells by the row id
-            sorted_added_cells = sorted(
-                commit.added_cells.values(), key=lambda b_tree_cell: b_tree_cell.row_id
-            )
-            CommitSqliteExporter._write_cells(
-                self._connection,
-                table_name,
-                column_count,
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                sorted_added_cells,
-                "Added",
-            )
-            sorted_updated_cells = sorted(
-                commit.updated_cells.values(),
-                key=lambda b_tree_cell: b_tree_cell.row_id,
-            )
-            CommitSqliteExporter._write_cells(
-                self._connection,
-                table_name,
-                column_count,
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                sorted_updated_cells,
-                "Updated",
-            )
-            sorted_deleted_cells = sorted(
-                commit.deleted_cells.values(),
-                key=lambda b_tree_cell: b_tree_cell.row_id,
-            )
-            CommitSqliteExporter._write_cells(
-                self._connection,
-                table_name,
-                column_count,
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                sorted_deleted_cells,
-                "Deleted",
-            )
+            row_id = attrgetter("row_id")
+            added_cells = sorted(commit.added_cells.values(), key=row_id)
+            updated_cells = sorted(commit.updated_cells.values(), key=row_id)
+            deleted_cells = sorted(commit.deleted_cells.values(), key=row_id)
 
             # We will not sort the carved cells since row ids are not deterministic even if parsed
             CommitSqliteExporter._write_cells(
-                self._connection,
+                self._cursor,
                 table_name,
                 column_count,
+                insert_statement,
                 commit.file_type,
                 commit.database_text_encoding,
                 commit.page_type,
-                commit.carved_cells.values(),
-                "Carved",
+                chain(
+                    zip(added_cells, repeat("Added")),
+                    zip(updated_cells, repeat("Updated")),
+                    zip(deleted_cells, repeat("Deleted")),
+                    zip(commit.carved_cells.values(), repeat("Carved")),
+                ),
             )
 
         else:
@@ -380,55 +401,56 @@ class CommitSqliteExporter:
             log_message = log_message.format(
                 commit.page_type, commit.name, self._sqlite_file_name
             )
-            logger.warning(log_message)
+            getLogger(LOGGER_NAME).warning(log_message)
             raise ExportError(log_message)
 
         """
 
-        Commit any entries written to the SQLite file.
+        Commit any entries written to the SQLite file once the commit interval has been reached.
 
         Note:  This is done to speed up writing to the SQLite file and was previously in the "_write_cells" function
-               and called after every set of cells written.  Now that it has been brought out here, it will execute
-               for every commit record.  This will reduce calls to commit and also make sure at least one statement
-               has been executed when calling a commit.  In addition the insert statement was changed to insert
-               many at a time instead of individually.
+               and called after every set of cells written.  It was then brought out here and executed for every
+               commit record.  Now the commit records are batched together and committed every commit interval
+               number of commit records, with any remaining entries committed when the exporter is exited.  In
+               addition the insert statement was changed to insert many at a time instead of individually.
 
         """
 
-        self._connection.commit()
+        self._uncommitted_writes += 1
+        if self._uncommitted_writes >= self._COMMIT_INTERVAL:
+            self._cursor.execute("COMMIT")
+            self._cursor.execute("BEGIN IMMEDIATE")
+            self._uncommitted_writes = 0
 
     @staticmethod
     def _write_cells(
-        connection,
+        cursor,
         table_name,
         column_count,
+        insert_statement,
         file_type,
         database_text_encoding,
         page_type,
         cells,
-        operation,
     ):
         """
 
-        This function will write the list of cells sent in to the connection under the table name specified including
-        the metadata regarding to the file type, page type, and operation.
+        This function will write the list of cells sent in using the cursor under the table name specified including
+        the metadata regarding to the file type, page type, and operation.  The cells are sent in as (cell, operation)
+        pairs so all of the operations for a commit can be inserted with a single executemany call.
 
         Note:  The types of the data in the values can prove to be an issue here.  For the most part we want to write
                back the value as the type that we read it out of the file as even though the data has the possibility
                of still being stored differently since we are leaving all data types to be undefined causing the storage
                algorithm internal to SQLite to slightly change.  Despite this, we make the following modifications in
                order to best ensure data integrity when writing the data back to the SQLite file:
-               1.) If the value is a bytearray, the value is interpreted as a blob object.  In order to write this
-                   back correctly, we set it to memoryview(value) in order to write it back to the SQLite database as
-                   a blob object.  Before we write it back, we make sure that the object does not have text affinity,
-                   or if it does we decode it in the database text encoding before writing it.
-               2.) If the value is a string, we encode it using UTF-8.  If this fails, that means it had characters
-                   not supported by the unicode encoding which caused it to fail.  Since we are writing back carved
-                   records that may have invalid characters in strings due to parts being overwritten or false
-                   positives, this can occur a lot.  Therefore, if the unicode encoding fails, we do the same
-                   as above for blob objects and create a memoryview(value) blob object and write that back to the
-                   database in order to maintain the original data.  Therefore, in some tables, depending on the
-                   data parsed or strings retrieved may be stored in either a string (text) or blob storage class.
+               1.) If the value is a bytes or bytearray object with text affinity, we decode it in the database text
+                   encoding before writing it.  Characters that cannot be decoded are replaced rather than failing
+                   since carved records may have invalid characters in strings due to parts being overwritten or
+                   false positives.
+               2.) If the value is a bytes or bytearray object without text affinity, the value is interpreted as a
+                   blob object and is bound directly so it is written back to the SQLite database as a blob object
+                   without making a copy of it.
                3.) If the value does not fall in one of the above use cases, we leave it as is and write it back to the
                    database without any modifications.
 
@@ -444,104 +466,134 @@ class CommitSqliteExporter:
                and multiply that number by the "None" field in order to pad out the row in the SQLite database
                with no data for the remaining columns.
 
-        :param connection:
+        :param cursor:
         :param table_name:
         :param column_count:
+        :param insert_statement:
         :param file_type:
         :param database_text_encoding:
         :param page_type:
         :param cells:
-        :param operation:
 
         :return:
 
         """
 
-        if cells:
+        cursor.executemany(
+            insert_statement,
+            CommitSqliteExporter._get_cell_rows(
+                table_name,
+                column_count,
+                file_type,
+                database_text_encoding,
+                page_type,
+                cells,
+            ),
+        )
 
-            entries = []
+    @staticmethod
+    def _get_cell_rows(
+        table_name,
+        column_count,
+        file_type,
+        database_text_encoding,
+        page_type,
+        cells,
+    ):
+        """
 
-            for cell in cells:
+        This function will generate the rows for the cells sent in including the metadata regarding the file type,
+        page type, and operation.  The rows are generated one at a time so they are inserted as they are built rather
+        than being collected into a list first.  See _write_cells for how the record column values are converted.
 
-                cell_record_column_values = []
-                for record_column in cell.payload.record_columns:
-                    serial_type = record_column.serial_type
-                    text_affinity = (
-                        True if serial_type >= 13 and serial_type % 2 == 1 else False
-                    )
-                    value = record_column.value
-
-                    if isinstance(value, bytearray):
-                        if text_affinity:
-                            value = value.decode(database_text_encoding, "replace")
-                        else:
-                            value = memoryview(value)
-                    elif isinstance(value, str):
-                        try:
-                            if text_affinity:
-                                value = value.decode(database_text_encoding, "replace")
-                            else:
-                                value = memoryview(value)
-                        except UnicodeDecodeError:
-
-                            """
-
-                            Note:  Here we do not decode or encode the value, since the above failed the value will
-                                   contain text that cannot be properly decoded and most likely due to random bytes
-                                   in a carving.  In this case, we just print the value without trying to account
-                                   for the database text encoding which may mean the text may appear differently
-                                   (ie. with spaces between each character), but it is better to do it this way
-                                   rather then to risk replacing characters since we don't know if it is indeed text.
-
-                            """
-
-                            value = memoryview(value)
-
-                    cell_record_column_values.append(value)
-
-                row = [
-                    file_type,
-                    cell.version_number,
-                    cell.page_version_number,
-                    cell.source,
-                    cell.page_number,
-                    cell.location,
-                    operation,
-                    cell.file_offset,
-                ]
-                if page_type == PAGE_TYPE.B_TREE_TABLE_LEAF:
-                    row.append(cell.row_id)
-                row.extend(cell_record_column_values)
+        Note:  If a row has more columns than the column count of the table, an ExportError is raised.
 
-                # Check the length of the row against the column count and pad it out with NULLs if necessary
-                if len(row) < column_count:
-                    row.extend([None] * (column_count - len(row)))
+        :param table_name:
+        :param column_count:
+        :param file_type:
+        :param database_text_encoding:
+        :param page_type:
+        :param cells:
 
-                if len(row) > column_count:
-                    log_message = (
-                        "The number of columns found in the row: {} were more than the expected: {} "
-                        "for sqlite export on master schema entry name: {} with file type: {} "
-                        "and page type: {}."
-                    )
-                    log_message = log_message.format(
-                        len(row), column_count, table_name, file_type, page_type
-                    )
-                    getLogger(LOGGER_NAME).warn(log_message)
-                    raise ExportError(log_message)
+        :return:
 
-                entries.append(tuple(row))
+        """
 
-            if not entries:
+        metadata_fields = [
+            "version_number",
+            "page_version_number",
+            "source",
+            "page_number",
+            "location",
+            "file_offset",
+        ]
+        if page_type == PAGE_TYPE.B_TREE_TABLE_LEAF:
+            metadata_fields.append("row_id")
+        cell_metadata = attrgetter(*metadata_fields)
+        record_column_fields = attrgetter("serial_type", "value")
+        decode_text = getdecoder(database_text_encoding)
+        byte_types = (bytes, bytearray)
+
+        for cell, operation in cells:
+
+            (
+                version_number,
+                page_version_number,
+                source,
+                page_number,
+                location,
+                *file_offset_and_row_id,
+            ) = cell_metadata(cell)
+
+            row = [
+                file_type,
+                version_number,
+                page_version_number,
+                source,
+                page_number,
+                location,
+                operation,
+                *file_offset_and_row_id,
+            ]
+
+            """
+
+            The record column values are added onto the row with a single list comprehension rather than appending
+            them one at a time.  Byte values with text affinity are decoded in the database text encoding and blobs
+            are bound as the bytes object read from the file without wrapping them in a memoryview.  The serial type
+            is checked first since it is the cheaper test and is only 13 or greater and odd for text values.
+
+            Note:  The serial type is checked for every value since it may change between records for the same column.
+
+            """
+
+            row += [
+                (
+                    decode_text(value, "replace")[0]
+                    if serial_type >= 13
+                    and serial_type & 1
+                    and isinstance(value, byte_types)
+                    else value
+                )
+                for serial_type, value in map(
+                    record_column_fields, cell.payload.record_columns
+                )
+            ]
+
+            # Check the length of the row against the column count and pad it out with NULLs if necessary
+            if len(row) < column_count:
+                row.extend(repeat(None, column_count - len(row)))
+
+            if len(row) > column_count:
                 log_message = (
-                    "Did not find any entries to write when cells were specified for sqlite export on "
-                    "master schema entry name: {} with file type: {} and page type: {}."
+                    "The number of columns found in the row: {} were more than the expected: {} "
+                    "for sqlite export on master schema entry name: {} with file type: {} "
+                    "and page type: {}."
+                )
+                log_message = log_message.format(
+                    len(row), column_count, table_name, file_type, page_type
                 )
-                log_message = log_message.format(table_name, file_type, page_type)
                 getLogger(LOGGER_NAME).warn(log_message)
                 raise ExportError(log_message)
 
-            number_of_rows = len(entries[0]) - 1
-
-            column_fields = "?" + (", ?" * number_of_rows)
-            insert_statement = f"INSERT INTO {table_name} VALUES ({column_fields})"
-            connection.executemany(insert_statement, entries)
+            yield row
@@ -1,9 +1,17 @@
+import sys
+from itertools import chain, repeat
 from logging import getLogger
+from operator import attrgetter
 from os import rename
 from os.path import exists, sep
 from uuid import uuid4
 
-from sqlite_dissect.constants import LOGGER_NAME, PAGE_TYPE, UTF_8
+from sqlite_dissect.constants import (
+    EXPORT_FILE_BUFFER_SIZE,
+    LOGGER_NAME,
+    PAGE_TYPE,
+    UTF_8,
+)
 from sqlite_dissect.exception import ExportError
 from sqlite_dissect.output import stringify_cell_record
 
@@ -45,8 +53,6 @@ class CommitConsoleExporter:
         if not commit.updated:
             return
 
-        logger = getLogger(LOGGER_NAME)
-
         commit_header = "Commit: {} updated in version: {} with root page number: {} on b-tree page numbers: {}."
         print(
             commit_header.format(
@@ -63,74 +69,33 @@ class CommitConsoleExporter:
                 commit.file_type,
                 commit.database_text_encoding,
                 commit.page_type,
-                commit.added_cells.values(),
-                "Added",
-            )
-            CommitConsoleExporter._write_cells(
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                commit.updated_cells.values(),
-                "Updated",
-            )
-            CommitConsoleExporter._write_cells(
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                commit.deleted_cells.values(),
-                "Deleted",
-            )
-            CommitConsoleExporter._write_cells(
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                commit.carved_cells.values(),
-                "Carved",
+                chain(
+                    zip(commit.added_cells.values(), repeat("Added")),
+                    zip(commit.updated_cells.values(), repeat("Updated")),
+                    zip(commit.deleted_cells.values(), repeat("Deleted")),
+                    zip(commit.carved_cells.values(), repeat("Carved")),
+                ),
             )
 
         elif commit.page_type == PAGE_TYPE.B_TREE_TABLE_LEAF:
 
             # Sort the added, updated, and deleted cells by the row id
-            sorted_added_cells = sorted(
-                commit.added_cells.values(), key=lambda b_tree_cell: b_tree_cell.row_id
-            )
-            CommitConsoleExporter._write_cells(
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                sorted_added_cells,
-                "Added",
-            )
-            sorted_updated_cells = sorted(
-                commit.updated_cells.values(),
-                key=lambda b_tree_cell: b_tree_cell.row_id,
-            )
-            CommitConsoleExporter._write_cells(
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                sorted_updated_cells,
-                "Updated",
-            )
-            sorted_deleted_cells = sorted(
-                commit.deleted_cells.values(),
-                key=lambda b_tree_cell: b_tree_cell.row_id,
-            )
-            CommitConsoleExporter._write_cells(
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                sorted_deleted_cells,
-                "Deleted",
-            )
+            row_id = attrgetter("row_id")
+            sorted_added_cells = sorted(commit.added_cells.values(), key=row_id)
+            sorted_updated_cells = sorted(commit.updated_cells.values(), key=row_id)
+            sorted_deleted_cells = sorted(commit.deleted_cells.values(), key=row_id)
 
             # We will not sort the carved cells since row ids are not deterministic even if parsed
             CommitConsoleExporter._write_cells(
                 commit.file_type,
                 commit.database_text_encoding,
                 commit.page_type,
-                commit.carved_cells.values(),
-                "Carved",
+                chain(
+                    zip(sorted_added_cells, repeat("Added")),
+                    zip(sorted_updated_cells, repeat("Updated")),
+                    zip(sorted_deleted_cells, repeat("Deleted")),
+                    zip(commit.carved_cells.values(), repeat("Carved")),
+                ),
             )
 
         else:
@@ -140,15 +105,16 @@ class CommitConsoleExporter:
                 "schema entry name: {} while writing to sqlite file name: {}."
             )
             log_message = log_message.format(commit.page_type, commit.name)
-            logger.warning(log_message)
+            getLogger(LOGGER_NAME).warning(log_message)
             raise ExportError(log_message)
 
     @staticmethod
-    def _write_cells(file_type, database_text_encoding, page_type, cells, operation):
+    def _write_cells(file_type, database_text_encoding, page_type, cells):
         """
 
         This function will write the list of cells sent in to the connection under the table name specified including
-        the metadata regarding to the file type, page type, and operation.
+        the metadata regarding to the file type, page type, and operation.  The cells are sent in as (cell, operation)
+        pairs so all of the operations for a commit are written in a single pass.
 
         Note:  Since we are writing out to text, all values are written as strings.
 
@@ -156,30 +122,33 @@ class CommitConsoleExporter:
         :param database_text_encoding:
         :param page_type:
         :param cells:
-        :param operation:
 
         :return:
 
         """
 
-        base_string = (
-            "File Type: {} Version Number: {} Page Version Number: {} Source: {} "
-            "Page Number: {} Location: {} Operation: {} File Offset: {}"
-        )
-        for cell in cells:
-            preface = base_string.format(
-                file_type,
-                cell.version_number,
-                cell.page_version_number,
-                cell.source,
-                cell.page_number,
-                cell.location,
-                operation,
-                cell.file_offset,
+        # The file type is the same for every cell so it is formatted into the start of the preface once
+        preface_start = f"File Type: {file_type} Version Number: "
+
+        """
+
+        The lines for all of the cells are joined and written to standard output in a single write rather than being
+        printed one at a time, since standard output flushes on every line when it is attached to a terminal.
+
+        Note:  Standard output is looked up when the cells are written rather than bound when this module is imported
+               so output is written to standard output even if it has been replaced since.
+
+        """
+
+        sys.stdout.write(
+            "".join(
+                f"{preface_start}{cell.version_number} Page Version Number: {cell.page_version_number} "
+                f"Source: {cell.source} Page Number: {cell.page_number} Location: {cell.location} "
+                f"Operation: {operation} File Offset: {cell.file_offset} "
+                f"{stringify_cell_record(cell, database_text_encoding, page_type)}.\n"
+                for cell, operation in cells
             )
-            row_values = stringify_cell_record(cell, database_text_encoding, page_type)
-            row_value = preface + " " + row_values + "."
-            print(row_value)
+        )
 
 
 class CommitTextExporter:
@@ -220,7 +189,14 @@ class CommitTextExporter:
             )
             getLogger(LOGGER_NAME).debug(log_message)
 
-        self._file_handle = open(self._text_file_name, "wb")
+        # The file is opened in text mode with a large buffer so each write does not need to be encoded and flushed
+        self._file_handle = open(
+            self._text_file_name,
+            "w",
+            encoding=UTF_8,
+            newline="",
+            buffering=EXPORT_FILE_BUFFER_SIZE,
+        )
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -235,8 +211,7 @@ class CommitTextExporter:
             master_schema_entry.sql,
         )
         header += "\n"
-        encoded = header.encode(UTF_8)
-        self._file_handle.write(encoded)
+        self._file_handle.write(header)
 
     def write_commit(self, commit):
         """
@@ -254,8 +229,6 @@ class CommitTextExporter:
         if not commit.updated:
             return
 
-        logger = getLogger(LOGGER_NAME)
-
         commit_header = "Commit: {} updated in version: {} with root page number: {} on b-tree page numbers: {}.\n"
         self._file_handle.write(
             commit_header.format(
@@ -263,7 +236,7 @@ class CommitTextExporter:
                 commit.version_number,
                 commit.root_page_number,
                 commit.b_tree_page_numbers,
-            ).encode(UTF_8)
+            )
         )
 
         if commit.page_type == PAGE_TYPE.B_TREE_INDEX_LEAF:
@@ -273,72 +246,21 @@ class CommitTextExporter:
                 commit.file_type,
                 commit.database_text_encoding,
                 commit.page_type,
-                commit.added_cells.values(),
-                "Added",
-            )
-            CommitTextExporter._write_cells(
-                self._file_handle,
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                commit.updated_cells.values(),
-                "Updated",
-            )
-            CommitTextExporter._write_cells(
-                self._file_handle,
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                commit.deleted_cells.values(),
-                "Deleted",
-            )
-            CommitTextExporter._write_cells(
-                self._file_handle,
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                commit.carved_cells.values(),
-                "Carved",
+                chain(
+                    zip(commit.added_cells.values(), repeat("Added")),
+                    zip(commit.updated_cells.values(), repeat("Updated")),
+                    zip(commit.deleted_cells.values(), repeat("Deleted")),
+                    zip(commit.carved_cells.values(), repeat("Carved")),
+                ),
             )
 
         elif commit.page_type == PAGE_TYPE.B_TREE_TABLE_LEAF:
 
             # Sort the added, updated, and deleted cells by the row id
-            sorted_added_cells = sorted(
-                commit.added_cells.values(), key=lambda b_tree_cell: b_tree_cell.row_id
-            )
-            CommitTextExporter._write_cells(
-                self._file_handle,
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                sorted_added_cells,
-                "Added",
-            )
-            sorted_updated_cells = sorted(
-                commit.updated_cells.values(),
-                key=lambda b_tree_cell: b_tree_cell.row_id,
-            )
-            CommitTextExporter._write_cells(
-                self._file_handle,
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                sorted_updated_cells,
-                "Updated",
-            )
-            sorted_deleted_cells = sorted(
-                commit.deleted_cells.values(),
-                key=lambda b_tree_cell: b_tree_cell.row_id,
-            )
-            CommitTextExporter._write_cells(
-                self._file_handle,
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                sorted_deleted_cells,
-                "Deleted",
-            )
+            row_id = attrgetter("row_id")
+            sorted_added_cells = sorted(commit.added_cells.values(), key=row_id)
+            sorted_updated_cells = sorted(commit.updated_cells.values(), key=row_id)
+            sorted_deleted_cells = sorted(commit.deleted_cells.values(), key=row_id)
 
             # We will not sort the carved cells since row ids are not deterministic even if parsed
             CommitTextExporter._write_cells(
@@ -346,8 +268,12 @@ class CommitTextExporter:
                 commit.file_type,
                 commit.database_text_encoding,
                 commit.page_type,
-                commit.carved_cells.values(),
-                "Carved",
+                chain(
+                    zip(sorted_added_cells, repeat("Added")),
+                    zip(sorted_updated_cells, repeat("Updated")),
+                    zip(sorted_deleted_cells, repeat("Deleted")),
+                    zip(commit.carved_cells.values(), repeat("Carved")),
+                ),
             )
 
         else:
@@ -359,17 +285,16 @@ class CommitTextExporter:
             log_message = log_message.format(
                 commit.page_type, commit.name, self._text_file_name
             )
-            logger.warning(log_message)
+            getLogger(LOGGER_NAME).warning(log_message)
             raise ExportError(log_message)
 
     @staticmethod
-    def _write_cells(
-        file_handle, file_type, database_text_encoding, page_type, cells, operation
-    ):
+    def _write_cells(file_handle, file_type, database_text_encoding, page_type, cells):
         """
 
         This function will write the list of cells sent in to the connection under the table name specified including
-        the metadata regarding to the file type, page type, and operation.
+        the metadata regarding to the file type, page type, and operation.  The cells are sent in as (cell, operation)
+        pairs so all of the operations for a commit are written in a single pass.
 
         Note:  Since we are writing out to text, all values are written as strings.
 
@@ -378,28 +303,19 @@ class CommitTextExporter:
         :param database_text_encoding:
         :param page_type:
         :param cells:
-        :param operation:
 
         :return:
 
         """
 
-        base_string = (
-            "File Type: {} Version Number: {} Page Version Number: {} Source: {} "
-            "Page Number: {} Location: {} Operation: {} File Offset: {}"
+        # The file type is the same for every cell so it is formatted into the start of the preface once
+        preface_start = f"File Type: {file_type} Version Number: "
+
+        # Each line is built with a single f-string and the lines are handed to the buffered file handle together
+        file_handle.writelines(
+            f"{preface_start}{cell.version_number} Page Version Number: {cell.page_version_number} "
+            f"Source: {cell.source} Page Number: {cell.page_number} Location: {cell.location} "
+            f"Operation: {operation} File Offset: {cell.file_offset} "
+            f"{stringify_cell_record(cell, database_text_encoding, page_type)}.\n"
+            for cell, operation in cells
         )
-        for cell in cells:
-            preface = base_string.format(
-                file_type,
-                cell.version_number,
-                cell.page_version_number,
-                cell.source,
-                cell.page_number,
-                cell.location,
-                operation,
-                cell.file_offset,
-            )
-            row_values = stringify_cell_record(cell, database_text_encoding, page_type)
-            full_str = preface + " " + row_values + ".\n"
-            encoded_str = full_str.encode(UTF_8)
-            file_handle.write(encoded_str)
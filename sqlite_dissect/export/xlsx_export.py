@@ -1,7 +1,9 @@
+from codecs import getdecoder, getencoder
+from itertools import chain, repeat
 from logging import getLogger
+from operator import attrgetter
 from os import rename
 from os.path import exists, sep
-from re import sub
 from uuid import uuid4
 
 from openpyxl import Workbook
@@ -32,6 +34,7 @@ class CommitXlsxExporter:
         self._xlsx_file_name = export_directory + sep + file_name
         self._sheets = {}
         self._long_sheet_name_translation_dictionary = {}
+        self._long_sheet_name_postfix_counts = {}
 
     def __enter__(self):
 
@@ -78,8 +81,6 @@ class CommitXlsxExporter:
         if not commit.updated:
             return
 
-        logger = getLogger(LOGGER_NAME)
-
         """
 
         In xlsx files, there is a limit to the number of characters allowed to be specified in a sheet name.  This
@@ -90,7 +91,9 @@ class CommitXlsxExporter:
         This is done by maintaining a dictionary of commit names longer than 31 characters and a sheet name
         based off of the commit name that is within the character limit.  If a commit name is longer than 31 characters,
         all characters past 30 are chopped off and then a integer is added to the end in the range of 0 to 9 depending
-        on the number of collisions that may occur for multiple similar commit names.
+        on the number of collisions that may occur for multiple similar commit names.  The number of truncated sheet
+        names made for each first 30 characters is kept in a second dictionary so the next integer to use is known
+        without having to check the names already made.
 
         Note:  There needs to be a better way to distinguish between similar commit names and if there are more than 10
                names similar in the first 30 characters, an exception will be raised.  Right now a maximum of 10 similar
@@ -98,9 +101,6 @@ class CommitXlsxExporter:
 
         """
 
-        # Setup the name postfix increment counter
-        name_postfix_increment = 0
-
         # Set the sheet name to be the commit name
         sheet_name = commit.name
 
@@ -116,44 +116,11 @@ class CommitXlsxExporter:
             # The sheet name was not already in the dictionary so we need to make a new name
             else:
 
-                # Continue while we are between 0 and 9
-                while name_postfix_increment < 10:
-
-                    # Create the truncated sheet name from the first 30 characters of the sheet name and name postfix
-                    truncated_sheet_name = sheet_name[:30] + str(name_postfix_increment)
-
-                    # CHeck if the name does not already exist in the dictionary
-                    if (
-                        truncated_sheet_name
-                        not in self._long_sheet_name_translation_dictionary
-                    ):
-
-                        # Add the sheet name and truncated sheet name into the dictionary
-                        self._long_sheet_name_translation_dictionary[sheet_name] = (
-                            truncated_sheet_name
-                        )
-
-                        # Set the sheet name
-                        sheet_name = truncated_sheet_name
-
-                        # Log a debug message for the truncation of the commit name as a sheet name
-                        log_message = (
-                            "Commit name: {} was truncated to: {} since it had a length of {} characters "
-                            "which is greater than the 31 allowed characters for a sheet name."
-                        )
-                        log_message = log_message.format(
-                            commit.name, sheet_name, len(commit.name)
-                        )
-                        logger.debug(log_message)
-
-                        # Break from the while loop
-                        break
-
-                    # The name already exists
-                    else:
-
-                        # Increment the name postfix counter
-                        name_postfix_increment += 1
+                # Get the name postfix increment from the number of names already made for the first 30 characters
+                truncated_sheet_name_prefix = sheet_name[:30]
+                name_postfix_increment = self._long_sheet_name_postfix_counts.get(
+                    truncated_sheet_name_prefix, 0
+                )
 
                 # Raise an exception if the name postfix increment counter reached 10
                 if name_postfix_increment == 10:
@@ -168,13 +135,39 @@ class CommitXlsxExporter:
                         len(commit.name),
                         self._xlsx_file_name,
                     )
-                    logger.warning(log_message)
+                    getLogger(LOGGER_NAME).warning(log_message)
                     raise ExportError(log_message)
 
-        sheet = self._sheets[sheet_name] if sheet_name in self._sheets else None
+                # Create the truncated sheet name from the first 30 characters of the sheet name and name postfix
+                truncated_sheet_name = truncated_sheet_name_prefix + str(
+                    name_postfix_increment
+                )
+
+                # Add the sheet name and truncated sheet name into the dictionary and increment the postfix count
+                self._long_sheet_name_translation_dictionary[sheet_name] = (
+                    truncated_sheet_name
+                )
+                self._long_sheet_name_postfix_counts[truncated_sheet_name_prefix] = (
+                    name_postfix_increment + 1
+                )
+
+                # Set the sheet name
+                sheet_name = truncated_sheet_name
+
+                # Log a debug message for the truncation of the commit name as a sheet name
+                log_message = (
+                    "Commit name: {} was truncated to: {} since it had a length of {} characters "
+                    "which is greater than the 31 allowed characters for a sheet name."
+                )
+                log_message = log_message.format(
+                    commit.name, sheet_name, len(commit.name)
+                )
+                getLogger(LOGGER_NAME).debug(log_message)
+
+        sheet = self._sheets.get(sheet_name)
         write_headers = False
 
-        if not sheet:
+        if sheet is None:
             sheet = self._workbook.create_sheet(sheet_name)
             self._sheets[sheet_name] = sheet
             write_headers = True
@@ -228,32 +221,12 @@ class CommitXlsxExporter:
                 commit.file_type,
                 commit.database_text_encoding,
                 commit.page_type,
-                commit.added_cells.values(),
-                "Added",
-            )
-            CommitXlsxExporter._write_cells(
-                sheet,
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                commit.updated_cells.values(),
-                "Updated",
-            )
-            CommitXlsxExporter._write_cells(
-                sheet,
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                commit.deleted_cells.values(),
-                "Deleted",
-            )
-            CommitXlsxExporter._write_cells(
-                sheet,
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                commit.carved_cells.values(),
-                "Carved",
+                chain(
+                    zip(commit.added_cells.values(), repeat("Added")),
+                    zip(commit.updated_cells.values(), repeat("Updated")),
+                    zip(commit.deleted_cells.values(), repeat("Deleted")),
+                    zip(commit.carved_cells.values(), repeat("Carved")),
+                ),
             )
 
         elif commit.page_type == PAGE_TYPE.B_TREE_TABLE_LEAF:
@@ -269,41 +242,10 @@ class CommitXlsxExporter:
                 sheet.append(column_headers)
 
             # Sort the added, updated, and deleted cells by the row id
-            sorted_added_cells = sorted(
-                commit.added_cells.values(), key=lambda b_tree_cell: b_tree_cell.row_id
-            )
-            CommitXlsxExporter._write_cells(
-                sheet,
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                sorted_added_cells,
-                "Added",
-            )
-            sorted_updated_cells = sorted(
-                commit.updated_cells.values(),
-                key=lambda b_tree_cell: b_tree_cell.row_id,
-            )
-            CommitXlsxExporter._write_cells(
-                sheet,
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                sorted_updated_cells,
-                "Updated",
-            )
-            sorted_deleted_cells = sorted(
-                commit.deleted_cells.values(),
-                key=lambda b_tree_cell: b_tree_cell.row_id,
-            )
-            CommitXlsxExporter._write_cells(
-                sheet,
-                commit.file_type,
-                commit.database_text_encoding,
-                commit.page_type,
-                sorted_deleted_cells,
-                "Deleted",
-            )
+            row_id = attrgetter("row_id")
+            sorted_added_cells = sorted(commit.added_cells.values(), key=row_id)
+            sorted_updated_cells = sorted(commit.updated_cells.values(), key=row_id)
+            sorted_deleted_cells = sorted(commit.deleted_cells.values(), key=row_id)
 
             # We will not sort the carved cells since row ids are not deterministic even if parsed
             CommitXlsxExporter._write_cells(
@@ -311,8 +253,12 @@ class CommitXlsxExporter:
                 commit.file_type,
                 commit.database_text_encoding,
                 commit.page_type,
-                commit.carved_cells.values(),
-                "Carved",
+                chain(
+                    zip(sorted_added_cells, repeat("Added")),
+                    zip(sorted_updated_cells, repeat("Updated")),
+                    zip(sorted_deleted_cells, repeat("Deleted")),
+                    zip(commit.carved_cells.values(), repeat("Carved")),
+                ),
             )
 
         else:
@@ -324,17 +270,16 @@ class CommitXlsxExporter:
             log_message = log_message.format(
                 commit.page_type, commit.name, self._xlsx_file_name
             )
-            logger.warning(log_message)
+            getLogger(LOGGER_NAME).warning(log_message)
             raise ExportError(log_message)
 
     @staticmethod
-    def _write_cells(
-        sheet, file_type, database_text_encoding, page_type, cells, operation
-    ):
+    def _write_cells(sheet, file_type, database_text_encoding, page_type, cells):
         """
 
         This function will write the list of cells sent in to the sheet specified including the metadata regarding
-        to the file type, page type, and operation.
+        to the file type, page type, and operation.  The cells are sent in as (cell, operation) pairs so all of the
+        operations for a commit are written in a single pass.
 
         Note:  The types of the data in the values can prove to be an issue here.  We want to write the value out as
                a string similarly as the text and csv outputs do for example even though it may contain invalid
@@ -351,12 +296,13 @@ class CommitXlsxExporter:
                          the value in the database text encoding.  When we decode using the database text encoding,
                          we specify to "replace" characters it does not recognize in order to compensate for carved
                          rows.
-                    b.)  We then test encoding it to UTF-8.
+                    b.)  We then test encoding it to UTF-8 if it is not ASCII, since ASCII strings always encode.
                          i.)   If the value successfully encodes as UTF-8 nothing is done further for this step.
                          ii.)  If the value throws an exception encoding, we have illegal unicode characters in the
-                               string that need to be addressed.  In order to escape these, we decode the string
-                               as UTF-8 using the "replace" method to replace any illegal unicode characters
-                               with '\ufffd' and set this back as the value.
+                               string that need to be addressed.  In order to escape these, we encode the string
+                               allowing the illegal characters through and decode it as UTF-8 using the "replace"
+                               method to replace any illegal unicode characters with '\ufffd' and set this back as
+                               the value.
                     c.)  After we have successfully set the value back to a UTF-8 compliant value, we need to check
                          the value for xml illegal characters.  If any of these xml illegal characters are found,
                          they are replaced with a space.  This behaviour may be different from how values are output
@@ -398,40 +344,22 @@ class CommitXlsxExporter:
         :param database_text_encoding:
         :param page_type:
         :param cells:
-        :param operation:
 
         :return:
 
         """
 
-        for cell in cells:
-            cell_record_column_values = []
-            for record_column in cell.payload.record_columns:
-                serial_type = record_column.serial_type
-                text_affinity = (
-                    True if serial_type >= 13 and serial_type % 2 == 1 else False
-                )
-                value = record_column.value
-                if isinstance(value, (bytes, bytearray, str)):
-                    if len(value) == 0 and isinstance(value, bytearray):
-                        value = None
-                    else:
-                        value = (
-                            value.decode(database_text_encoding, "replace")
-                            if text_affinity
-                            else str(value)
-                        )
-                        try:
-                            value.encode(UTF_8)
-                        except UnicodeDecodeError:
-                            value = value.decode(UTF_8, "replace").encode(UTF_8)
-                        if not isinstance(value, str):
-                            value = value.decode(UTF_8)
-                        if value[0] == "=":
-                            value = " " + value
-                        value = sub(ILLEGAL_XML_CHARACTER_PATTERN, " ", value)
-                cell_record_column_values.append(value)
+        # Bind the pattern substitution and value types once rather than looking them up for every column
+        replace_illegal_xml_characters = ILLEGAL_XML_CHARACTER_PATTERN.sub
+        string_types = (bytes, bytearray, str)
+
+        # Look up the codecs once rather than on every encode and decode of a value
+        decode_text = getdecoder(database_text_encoding)
+        encode_utf_8 = getencoder(UTF_8)
 
+        include_row_id = page_type == PAGE_TYPE.B_TREE_TABLE_LEAF
+
+        for cell, operation in cells:
             row = [
                 file_type,
                 cell.version_number,
@@ -442,7 +370,36 @@ class CommitXlsxExporter:
                 operation,
                 cell.file_offset,
             ]
-            if page_type == PAGE_TYPE.B_TREE_TABLE_LEAF:
+            if include_row_id:
                 row.append(cell.row_id)
-            row.extend(cell_record_column_values)
+
+            # The record column values are appended straight onto the row to avoid building a second list per cell
+            append_value = row.append
+            for record_column in cell.payload.record_columns:
+                value = record_column.value
+                if isinstance(value, string_types):
+                    if len(value) == 0 and isinstance(value, bytearray):
+                        value = None
+                    else:
+                        serial_type = record_column.serial_type
+                        value = (
+                            decode_text(value, "replace")[0]
+                            if serial_type >= 13 and serial_type & 1
+                            else str(value)
+                        )
+                        # ASCII strings always encode as UTF-8 so only the other strings need to be checked
+                        if not value.isascii():
+                            try:
+                                encode_utf_8(value)
+                            except UnicodeEncodeError:
+                                value = value.encode(UTF_8, "surrogatepass").decode(
+                                    UTF_8, "replace"
+                                )
+                        if value.startswith("="):
+                            value = " " + value
+                        # Every xml illegal character is non-printable so printable strings can skip the scan
+                        if not value.isprintable():
+                            value = replace_illegal_xml_characters(" ", value)
+                append_value(value)
+
             sheet.append(row)
@@ -1,4 +1,4 @@
-from copy import copy
+from logging import DEBUG
 from warnings import warn
 
 from sqlite_dissect.constants import (
@@ -95,6 +95,26 @@ class Database(Version):
 
         """
 
+        # Calculate the number of whole pages from the file size and page size once for the checks below
+        calculated_size_in_pages, remaining_bytes = divmod(
+            self.file_handle.file_size, self.page_size
+        )
+
+        # The calculated size in pages is the number of whole pages so any partial page at the end is reported
+        if remaining_bytes:
+            log_message = (
+                "The file size: {} is not a multiple of the page size: {} for version: {}.  The remaining {} "
+                "bytes at the end of the file are not included in the calculated size in pages."
+            )
+            log_message = log_message.format(
+                self.file_handle.file_size,
+                self.page_size,
+                self.version_number,
+                remaining_bytes,
+            )
+            self._logger.warning(log_message)
+            warn(log_message, RuntimeWarning)
+
         # The database header size in pages is not set
         if self.database_header.database_size_in_pages == 0:
 
@@ -121,8 +141,8 @@ class Database(Version):
                 self._logger.error(log_message)
                 raise DatabaseParsingError(log_message)
 
-            # Calculate the number of pages from the file size and page size
-            self.database_size_in_pages = self.file_handle.file_size / self.page_size
+            # Use the number of pages calculated from the file size and page size
+            self.database_size_in_pages = calculated_size_in_pages
 
         # The database header size in pages is set and the version valid for number does not equal the change counter
         elif (
@@ -137,8 +157,8 @@ class Database(Version):
 
             """
 
-            # Calculate the number of pages from the file size and page size
-            self.database_size_in_pages = self.file_handle.file_size / self.page_size
+            # Use the number of pages calculated from the file size and page size
+            self.database_size_in_pages = calculated_size_in_pages
 
             log_message = (
                 "Database header for version: {} specifies a database size in pages of {} but version "
@@ -177,8 +197,6 @@ class Database(Version):
 
             """
 
-            calculated_size_in_pages = self.file_handle.file_size / self.page_size
-
             if self.database_header.database_size_in_pages != calculated_size_in_pages:
 
                 # Set the database size in pages to the database header size in pages
@@ -214,34 +232,43 @@ class Database(Version):
         The page version index will set all page numbers currently in the database pages to the version number of
         this first version (version number 0).
 
+        Note:  The updated page numbers and page version index are kept as a list and dictionary rather than a range
+               and a lazily evaluated index since the write ahead log commit records copy the page version index as a
+               dictionary to build their own and both are reported in full when the version is stringified.  The
+               page numbers are created from the range directly rather than through a comprehension.
+
         """
 
-        self.updated_page_numbers = [
-            page_index + 1 for page_index in range(int(self.database_size_in_pages))
-        ]
-        self.page_version_index = dict(
-            map(lambda x: [x, self.version_number], self.updated_page_numbers)
+        self.updated_page_numbers = list(range(1, self.database_size_in_pages + 1))
+        self.page_version_index = dict.fromkeys(
+            self.updated_page_numbers, self.version_number
         )
 
-        self._logger.debug(
-            "Updated page numbers initialized as: {} in version: {}.".format(
-                self.updated_page_numbers, self.version_number
+        # Both of these hold an entry for every page in the database so they are only formatted if they will be logged
+        if self._logger.isEnabledFor(DEBUG):
+            self._logger.debug(
+                "Updated page numbers initialized as: {} in version: {}.".format(
+                    self.updated_page_numbers, self.version_number
+                )
             )
-        )
-        self._logger.debug(
-            "Page version index initialized as: {} in version: {}.".format(
-                self.page_version_index, self.version_number
+            self._logger.debug(
+                "Page version index initialized as: {} in version: {}.".format(
+                    self.page_version_index, self.version_number
+                )
             )
-        )
 
         """
 
-        Here we setup the updated b-tree page numbers.  This array will be removed from as we parse through the file
-        to leave just the b-tree pages of the commit record that were updated at the end.
+        Here we setup the updated b-tree page numbers.  The page numbers that are not b-tree pages are collected as we
+        parse through the file and are taken out of the updated page numbers in a single pass at the end to leave just
+        the b-tree pages of the commit record that were updated.
+
+        Note:  The non b-tree page numbers are kept in a set rather than removing each one from a copy of the updated
+               page numbers since removing from a list is linear in the number of pages in the database.
 
         """
 
-        self.updated_b_tree_page_numbers = copy(self.updated_page_numbers)
+        non_b_tree_page_numbers = set()
 
         """
 
@@ -266,7 +293,7 @@ class Database(Version):
         while freelist_trunk_page:
 
             # Remove it from the updated b-tree pages
-            self.updated_b_tree_page_numbers.remove(freelist_trunk_page.number)
+            non_b_tree_page_numbers.add(freelist_trunk_page.number)
 
             self.freelist_page_numbers.append(freelist_trunk_page.number)
             observed_freelist_pages += 1
@@ -308,7 +335,7 @@ class Database(Version):
         for pointer_map_page in self.pointer_map_pages:
 
             # Remove it from the updated b-tree pages
-            self.updated_b_tree_page_numbers.remove(pointer_map_page.number)
+            non_b_tree_page_numbers.add(pointer_map_page.number)
 
             self.pointer_map_page_numbers.append(pointer_map_page.number)
 
@@ -337,8 +364,13 @@ class Database(Version):
         self._master_schema = MasterSchema(self, self.root_page)
 
         #  Remove the master schema pages from the updated b-tree pages (this will always include the root page number)
-        for master_schema_page_number in self.master_schema.master_schema_page_numbers:
-            self.updated_b_tree_page_numbers.remove(master_schema_page_number)
+        non_b_tree_page_numbers.update(self.master_schema.master_schema_page_numbers)
+
+        self.updated_b_tree_page_numbers = [
+            page_number
+            for page_number in self.updated_page_numbers
+            if page_number not in non_b_tree_page_numbers
+        ]
 
         """
 
@@ -406,18 +438,18 @@ class Database(Version):
 
     def get_page_data(self, page_number, offset=0, number_of_bytes=None):
 
+        page_size = self.page_size
+
         # Set the number of bytes to the rest of the page if it was not set
-        number_of_bytes = (
-            self.page_size - offset if not number_of_bytes else number_of_bytes
-        )
+        number_of_bytes = page_size - offset if not number_of_bytes else number_of_bytes
 
-        if offset >= self.page_size:
+        if offset >= page_size:
             log_message = "Requested offset: {} is >= the page size: {} for page: {}."
-            log_message = log_message.format(offset, self.page_size, page_number)
+            log_message = log_message.format(offset, page_size, page_number)
             self._logger.error(log_message)
             raise ValueError(log_message)
 
-        if offset + number_of_bytes > self.page_size:
+        if offset + number_of_bytes > page_size:
             log_message = (
                 "Requested length of data: {} at offset {} to {} is greater than the page "
                 "size: {} for page: {}."
@@ -426,15 +458,15 @@ class Database(Version):
                 number_of_bytes,
                 offset,
                 number_of_bytes + offset,
-                self.page_size,
+                page_size,
                 page_number,
             )
             self._logger.error(log_message)
             raise ValueError(log_message)
 
-        page_offset = self.get_page_offset(page_number)
-
-        return self.file_handle.read_data(page_offset + offset, number_of_bytes)
+        return self.file_handle.read_data(
+            self.get_page_offset(page_number) + offset, number_of_bytes
+        )
 
     def get_page_offset(self, page_number):
 
@@ -1,8 +1,6 @@
-from abc import ABCMeta
 from binascii import hexlify
 from logging import getLogger
-from re import compile
-from struct import error, unpack
+from struct import Struct
 from warnings import warn
 
 from sqlite_dissect.constants import (
@@ -14,15 +12,13 @@ from sqlite_dissect.constants import (
     LEAF_PAYLOAD_FRACTION,
     LOGGER_NAME,
     MAGIC_HEADER_STRING,
-    MASTER_PAGE_HEX_ID,
+    MASTER_PAGE_FIRST_BYTE,
     MAXIMUM_EMBEDDED_PAYLOAD_FRACTION,
     MAXIMUM_PAGE_SIZE,
     MAXIMUM_PAGE_SIZE_INDICATOR,
     MAXIMUM_PAGE_SIZE_LIMIT,
     MINIMUM_EMBEDDED_PAYLOAD_FRACTION,
     MINIMUM_PAGE_SIZE_LIMIT,
-    RESERVED_FOR_EXPANSION_REGEX,
-    RIGHT_MOST_POINTER_LENGTH,
     RIGHT_MOST_POINTER_OFFSET,
     ROLLBACK_JOURNALING_MODE,
     SQLITE_DATABASE_HEADER_LENGTH,
@@ -44,8 +40,53 @@ DatabaseHeader(SQLiteHeader)
 
 """
 
+# The unpack functions of precompiled structs for reading big-endian values at an offset without slicing the data
+_unpack_unsigned_short = Struct(">H").unpack_from
+_unpack_unsigned_integer = Struct(">I").unpack_from
+
+"""
+
+The database header is unpacked with a single struct in the order of its fields:
+magic header string (16 bytes), page size (2 bytes), the file format write and read versions, reserved bytes per page,
+maximum and minimum embedded payload fractions and leaf payload fraction (1 byte each), twelve 4 byte fields from the
+file change counter through the application id, the space reserved for expansion (20 bytes), and the version valid for
+number and sqlite version number (4 bytes each).
+
+"""
+
+_unpack_database_header = Struct(">16sHBBBBBB12I20sII").unpack
+
 
 class DatabaseHeader(SQLiteHeader):
+
+    # The template is built once with the padding as a named field rather than concatenated on every call
+    _STRINGIFY_TEMPLATE = (
+        "{padding}Magic Header String: {}\n"
+        "{padding}Page Size: {}\n"
+        "{padding}File Format Write Version: {}\n"
+        "{padding}File Format Read Version: {}\n"
+        "{padding}Reserved Bytes per Page: {}\n"
+        "{padding}Maximum Embedded Payload Fraction: {}\n"
+        "{padding}Minimum Embedded Payload Fraction: {}\n"
+        "{padding}Leaf Payload Fraction: {}\n"
+        "{padding}File Change Counter: {}\n"
+        "{padding}Database Size in Pages: {}\n"
+        "{padding}First Freelist Trunk Page Number: {}\n"
+        "{padding}Number of Freelist Pages: {}\n"
+        "{padding}Schema Cookie: {}\n"
+        "{padding}Schema Format Number: {}\n"
+        "{padding}Default Page Cache Size: {}\n"
+        "{padding}Largest Root B-Tree Page Number: {}\n"
+        "{padding}Database Text Encoding: {}\n"
+        "{padding}User Version: {}\n"
+        "{padding}Incremental Vacuum Mode: {}\n"
+        "{padding}Application ID: {}\n"
+        "{padding}Reserved for Expansion (Hex): {}\n"
+        "{padding}Version Valid for Number: {}\n"
+        "{padding}SQLite Version Number: {}\n"
+        "{padding}MD5 Hex Digest: {}"
+    )
+
     def __init__(self, database_header_byte_array):
 
         super().__init__()
@@ -60,29 +101,37 @@ class DatabaseHeader(SQLiteHeader):
             logger.error(log_message)
             raise ValueError(log_message)
 
-        try:
-
-            self.magic_header_string = database_header_byte_array[0:16]
-
-        except error:
-
-            logger.error("Failed to retrieve the magic header.")
-            raise
+        (
+            self.magic_header_string,
+            self.page_size,
+            self.file_format_write_version,
+            self.file_format_read_version,
+            self.reserved_bytes_per_page,
+            self.maximum_embedded_payload_fraction,
+            self.minimum_embedded_payload_fraction,
+            self.leaf_payload_fraction,
+            self.file_change_counter,
+            self.database_size_in_pages,
+            self.first_freelist_trunk_page_number,
+            self.number_of_freelist_pages,
+            self.schema_cookie,
+            self.schema_format_number,
+            self.default_page_cache_size,
+            self.largest_root_b_tree_page_number,
+            self.database_text_encoding,
+            self.user_version,
+            self.incremental_vacuum_mode,
+            self.application_id,
+            self.reserved_for_expansion,
+            self.version_valid_for_number,
+            self.sqlite_version_number,
+        ) = _unpack_database_header(database_header_byte_array)
 
         if self.magic_header_string != MAGIC_HEADER_STRING:
             log_message = "The magic header string is invalid."
             logger.error(log_message)
             raise HeaderParsingError(log_message)
 
-        try:
-
-            self.page_size = unpack(b">H", database_header_byte_array[16:18])[0]
-
-        except error:
-
-            logger.error("Failed to retrieve the page size.")
-            raise
-
         if self.page_size == MAXIMUM_PAGE_SIZE_INDICATOR:
             self.page_size = MAXIMUM_PAGE_SIZE
         elif self.page_size < MINIMUM_PAGE_SIZE_LIMIT:
@@ -100,15 +149,6 @@ class DatabaseHeader(SQLiteHeader):
             logger.error(log_message)
             raise HeaderParsingError(log_message)
 
-        try:
-
-            self.file_format_write_version = ord(database_header_byte_array[18:19])
-
-        except TypeError:
-
-            logger.error("Failed to retrieve the file format write version.")
-            raise
-
         if self.file_format_write_version not in [
             ROLLBACK_JOURNALING_MODE,
             WAL_JOURNALING_MODE,
@@ -117,15 +157,6 @@ class DatabaseHeader(SQLiteHeader):
             logger.error(log_message)
             raise HeaderParsingError(log_message)
 
-        try:
-
-            self.file_format_read_version = ord(database_header_byte_array[19:20])
-
-        except TypeError:
-
-            logger.error("Failed to retrieve the file format read version.")
-            raise
-
         if self.file_format_read_version not in [
             ROLLBACK_JOURNALING_MODE,
             WAL_JOURNALING_MODE,
@@ -134,15 +165,6 @@ class DatabaseHeader(SQLiteHeader):
             logger.error(log_message)
             raise HeaderParsingError(log_message)
 
-        try:
-
-            self.reserved_bytes_per_page = ord(database_header_byte_array[20:21])
-
-        except TypeError:
-
-            logger.error("Failed to retrieve the reserved bytes per page.")
-            raise
-
         if self.reserved_bytes_per_page != 0:
             log_message = (
                 "Reserved bytes per page is not 0 but {} and is not implemented."
@@ -151,17 +173,6 @@ class DatabaseHeader(SQLiteHeader):
             logger.error(log_message)
             raise NotImplementedError(log_message)
 
-        try:
-
-            self.maximum_embedded_payload_fraction = ord(
-                database_header_byte_array[21:22]
-            )
-
-        except TypeError:
-
-            logger.error("Failed to retrieve the maximum embedded payload fraction.")
-            raise
-
         if self.maximum_embedded_payload_fraction != MAXIMUM_EMBEDDED_PAYLOAD_FRACTION:
             log_message = "Maximum embedded payload fraction: {} is not expected the expected value of: {}."
             log_message = log_message.format(
@@ -171,17 +182,6 @@ class DatabaseHeader(SQLiteHeader):
             logger.error(log_message)
             raise HeaderParsingError(log_message)
 
-        try:
-
-            self.minimum_embedded_payload_fraction = ord(
-                database_header_byte_array[22:23]
-            )
-
-        except TypeError:
-
-            logger.error("Failed to retrieve the minimum embedded payload fraction.")
-            raise
-
         if self.minimum_embedded_payload_fraction != MINIMUM_EMBEDDED_PAYLOAD_FRACTION:
             log_message = "Minimum embedded payload fraction: {} is not expected the expected value of: {}."
             log_message = log_message.format(
@@ -191,15 +191,6 @@ class DatabaseHeader(SQLiteHeader):
             logger.error(log_message)
             raise HeaderParsingError(log_message)
 
-        try:
-
-            self.leaf_payload_fraction = ord(database_header_byte_array[23:24])
-
-        except TypeError:
-
-            logger.error("Failed to retrieve the leaf payload fraction.")
-            raise
-
         if self.leaf_payload_fraction != LEAF_PAYLOAD_FRACTION:
             log_message = (
                 "Leaf payload fraction: {} is not expected the expected value of: {}."
@@ -210,28 +201,6 @@ class DatabaseHeader(SQLiteHeader):
             logger.error(log_message)
             raise HeaderParsingError(log_message)
 
-        self.file_change_counter = unpack(b">I", database_header_byte_array[24:28])[0]
-        self.database_size_in_pages = unpack(b">I", database_header_byte_array[28:32])[
-            0
-        ]
-        self.first_freelist_trunk_page_number = unpack(
-            b">I", database_header_byte_array[32:36]
-        )[0]
-        self.number_of_freelist_pages = unpack(
-            b">I", database_header_byte_array[36:40]
-        )[0]
-        self.schema_cookie = unpack(b">I", database_header_byte_array[40:44])[0]
-        self.schema_format_number = unpack(b">I", database_header_byte_array[44:48])[0]
-        self.default_page_cache_size = unpack(b">I", database_header_byte_array[48:52])[
-            0
-        ]
-        self.largest_root_b_tree_page_number = unpack(
-            b">I", database_header_byte_array[52:56]
-        )[0]
-        self.database_text_encoding = unpack(b">I", database_header_byte_array[56:60])[
-            0
-        ]
-
         if self.schema_format_number == 0 and self.database_text_encoding == 0:
 
             """
@@ -265,11 +234,6 @@ class DatabaseHeader(SQLiteHeader):
                 logger.error(log_message)
                 raise HeaderParsingError(log_message)
 
-        self.user_version = unpack(b">I", database_header_byte_array[60:64])[0]
-        self.incremental_vacuum_mode = unpack(b">I", database_header_byte_array[64:68])[
-            0
-        ]
-
         """
 
         Originally a check was done that if the largest root b-tree page number existed and the database was less
@@ -299,77 +263,19 @@ class DatabaseHeader(SQLiteHeader):
             logger.error(log_message)
             raise HeaderParsingError(log_message)
 
-        self.application_id = unpack(b">I", database_header_byte_array[68:72])[0]
-        self.reserved_for_expansion = database_header_byte_array[72:92]
-
-        pattern = compile(RESERVED_FOR_EXPANSION_REGEX)
-        reserved_for_expansion_hex = hexlify(self.reserved_for_expansion).decode()
-        if not pattern.match(reserved_for_expansion_hex):
-            log_message = f"Header space reserved for expansion is not zero: {reserved_for_expansion_hex}."
+        # Any non-zero byte in the space reserved for expansion is invalid
+        if any(self.reserved_for_expansion):
+            log_message = (
+                "Header space reserved for expansion is not zero: "
+                f"{hexlify(self.reserved_for_expansion).decode()}."
+            )
             logger.error(log_message)
             raise HeaderParsingError(log_message)
 
-        self.version_valid_for_number = unpack(
-            b">I", database_header_byte_array[92:96]
-        )[0]
-        self.sqlite_version_number = unpack(b">I", database_header_byte_array[96:100])[
-            0
-        ]
-
         self.md5_hex_digest = get_md5_hash(database_header_byte_array)
 
     def stringify(self, padding=""):
-        string = (
-            padding
-            + "Magic Header String: {}\n"
-            + padding
-            + "Page Size: {}\n"
-            + padding
-            + "File Format Write Version: {}\n"
-            + padding
-            + "File Format Read Version: {}\n"
-            + padding
-            + "Reserved Bytes per Page: {}\n"
-            + padding
-            + "Maximum Embedded Payload Fraction: {}\n"
-            + padding
-            + "Minimum Embedded Payload Fraction: {}\n"
-            + padding
-            + "Leaf Payload Fraction: {}\n"
-            + padding
-            + "File Change Counter: {}\n"
-            + padding
-            + "Database Size in Pages: {}\n"
-            + padding
-            + "First Freelist Trunk Page Number: {}\n"
-            + padding
-            + "Number of Freelist Pages: {}\n"
-            + padding
-            + "Schema Cookie: {}\n"
-            + padding
-            + "Schema Format Number: {}\n"
-            + padding
-            + "Default Page Cache Size: {}\n"
-            + padding
-            + "Largest Root B-Tree Page Number: {}\n"
-            + padding
-            + "Database Text Encoding: {}\n"
-            + padding
-            + "User Version: {}\n"
-            + padding
-            + "Incremental Vacuum Mode: {}\n"
-            + padding
-            + "Application ID: {}\n"
-            + padding
-            + "Reserved for Expansion (Hex): {}\n"
-            + padding
-            + "Version Valid for Number: {}\n"
-            + padding
-            + "SQLite Version Number: {}\n"
-            + padding
-            + "MD5 Hex Digest: {}"
-        )
-        return string.format(
+        return self._STRINGIFY_TEMPLATE.format(
             self.magic_header_string,
             self.page_size,
             HUMAN_READABLE_JOURNALING_MODES[self.file_format_write_version],
@@ -394,12 +300,48 @@ class DatabaseHeader(SQLiteHeader):
             self.version_valid_for_number,
             self.sqlite_version_number,
             self.md5_hex_digest,
+            padding=padding,
         )
 
 
 class BTreePageHeader:
-
-    __metaclass__ = ABCMeta
+    """
+
+    Note:  A b-tree page header is created for every b-tree page parsed so slots are used rather than an instance
+           dictionary to reduce the memory held by each header.  The leaf and interior page header subclasses
+           declare their own slots for the same reason.
+
+    Note:  Since slots are used, the b-tree page headers no longer have an instance dictionary and attributes other than
+           the ones declared in the slots can no longer be set on them.
+
+    """
+
+    __slots__ = (
+        "offset",
+        "header_length",
+        "contains_sqlite_database_header",
+        "root_page_only_md5_hex_digest",
+        "page_type",
+        "first_freeblock_offset",
+        "number_of_cells_on_page",
+        "cell_content_offset",
+        "number_of_fragmented_free_bytes",
+        "_header_byte_array",
+        "_md5_hex_digest",
+    )
+
+    _STRINGIFY_TEMPLATE = (
+        "{padding}Contains SQLite Database Header: {}\n"
+        "{padding}Root Page Only MD5 Hex Digest: {}\n"
+        "{padding}Page Type (Hex): {}\n"
+        "{padding}Offset: {}\n"
+        "{padding}Length: {}\n"
+        "{padding}First Freeblock Offset: {}\n"
+        "{padding}Number of Cells on Page: {}\n"
+        "{padding}Cell Content Offset: {}\n"
+        "{padding}Number of Fragmented Free Bytes: {}\n"
+        "{padding}MD5 Hex Digest: {}"
+    )
 
     def __init__(self, page, header_length):
 
@@ -416,29 +358,30 @@ class BTreePageHeader:
 
         self.root_page_only_md5_hex_digest = None
 
-        first_page_byte = page[0:1]
-        if first_page_byte == MASTER_PAGE_HEX_ID:
+        if page[0] == MASTER_PAGE_FIRST_BYTE:
             self.contains_sqlite_database_header = True
+            # The rest of the page is hashed through a memoryview so it is not copied into a new bytes object first
             self.root_page_only_md5_hex_digest = get_md5_hash(
-                page[SQLITE_DATABASE_HEADER_LENGTH:]
+                memoryview(page)[SQLITE_DATABASE_HEADER_LENGTH:]
             )
             self.offset += SQLITE_DATABASE_HEADER_LENGTH
 
         self.page_type = page[self.offset : self.offset + 1]
-        self.first_freeblock_offset = unpack(
-            b">H", page[self.offset + 1 : self.offset + 3]
-        )[0]
-        self.number_of_cells_on_page = unpack(
-            b">H", page[self.offset + 3 : self.offset + 5]
-        )[0]
-        self.cell_content_offset = unpack(
-            b">H", page[self.offset + 5 : self.offset + 7]
-        )[0]
-        self.number_of_fragmented_free_bytes = ord(
-            page[self.offset + 7 : self.offset + 8]
-        )
+        self.first_freeblock_offset = _unpack_unsigned_short(page, self.offset + 1)[0]
+        self.number_of_cells_on_page = _unpack_unsigned_short(page, self.offset + 3)[0]
+        self.cell_content_offset = _unpack_unsigned_short(page, self.offset + 5)[0]
+        self.number_of_fragmented_free_bytes = page[self.offset + 7]
+
+        """
+
+        Note:  The md5 hex digest of the page header is only used when the header is stringified so only the header
+               bytes are kept here and the digest is calculated the first time it is requested.  The digest is then
+               cached and the header bytes are released since they are no longer needed.
 
-        self.md5_hex_digest = get_md5_hash(page[self.offset : self.header_length])
+        """
+
+        self._header_byte_array = page[self.offset : self.header_length]
+        self._md5_hex_digest = None
 
     def __repr__(self):
         return self.__str__()
@@ -446,30 +389,15 @@ class BTreePageHeader:
     def __str__(self):
         return self.stringify().replace("\t", "").replace("\n", " ")
 
+    @property
+    def md5_hex_digest(self):
+        if self._md5_hex_digest is None:
+            self._md5_hex_digest = get_md5_hash(self._header_byte_array)
+            self._header_byte_array = None
+        return self._md5_hex_digest
+
     def stringify(self, padding=""):
-        string = (
-            padding
-            + "Contains SQLite Database Header: {}\n"
-            + padding
-            + "Root Page Only MD5 Hex Digest: {}\n"
-            + padding
-            + "Page Type (Hex): {}\n"
-            + padding
-            + "Offset: {}\n"
-            + padding
-            + "Length: {}\n"
-            + padding
-            + "First Freeblock Offset: {}\n"
-            + padding
-            + "Number of Cells on Page: {}\n"
-            + padding
-            + "Cell Content Offset: {}\n"
-            + padding
-            + "Number of Fragmented Free Bytes: {}\n"
-            + padding
-            + "MD5 Hex Digest: {}"
-        )
-        return string.format(
+        return self._STRINGIFY_TEMPLATE.format(
             self.contains_sqlite_database_header,
             self.root_page_only_md5_hex_digest,
             hexlify(self.page_type),
@@ -480,27 +408,33 @@ class BTreePageHeader:
             self.cell_content_offset,
             self.number_of_fragmented_free_bytes,
             self.md5_hex_digest,
+            padding=padding,
         )
 
 
 class LeafPageHeader(BTreePageHeader):
+
+    __slots__ = ()
+
     def __init__(self, page):
         super().__init__(page, LEAF_PAGE_HEADER_LENGTH)
 
 
 class InteriorPageHeader(BTreePageHeader):
+
+    __slots__ = ("right_most_pointer",)
+
+    # The right most pointer is appended to the stringified b-tree page header
+    _RIGHT_MOST_POINTER_TEMPLATE = "\n{padding}Right Most Pointer: {}"
+
     def __init__(self, page):
         super().__init__(page, INTERIOR_PAGE_HEADER_LENGTH)
 
-        right_most_pointer_start_offset = self.offset + RIGHT_MOST_POINTER_OFFSET
-        right_most_pointer_end_offset = (
-            right_most_pointer_start_offset + RIGHT_MOST_POINTER_LENGTH
-        )
-        self.right_most_pointer = unpack(
-            b">I", page[right_most_pointer_start_offset:right_most_pointer_end_offset]
+        self.right_most_pointer = _unpack_unsigned_integer(
+            page, self.offset + RIGHT_MOST_POINTER_OFFSET
         )[0]
 
     def stringify(self, padding=""):
-        string = "\n" + padding + "Right Most Pointer: {}"
-        string = string.format(self.right_most_pointer)
-        return super().stringify(padding) + string
+        return super().stringify(padding) + self._RIGHT_MOST_POINTER_TEMPLATE.format(
+            self.right_most_pointer, padding=padding
+        )
@@ -139,13 +139,6 @@ def create_pointer_map_pages(version, database_size_in_pages, page_size):
 
     maximum_entries_per_page = get_maximum_pointer_map_entries_per_page(page_size)
 
-    number_of_pointer_map_pages = 1
-    if database_size_in_pages - 2 > maximum_entries_per_page:
-        database_pages_left = database_size_in_pages - 2 - maximum_entries_per_page
-        while database_pages_left > 0:
-            database_pages_left -= maximum_entries_per_page - 1
-            number_of_pointer_map_pages += 1
-
     pointer_map_pages = []
     pointer_map_page_number = 2
     number_of_pointer_map_pages = 0
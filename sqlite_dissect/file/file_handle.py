@@ -1,5 +1,6 @@
 import os
 from logging import getLogger
+from mmap import ACCESS_READ, mmap
 from warnings import warn
 
 from sqlite_dissect.constants import (
@@ -22,6 +23,11 @@ from sqlite_dissect.file.journal.header import RollbackJournalHeader
 from sqlite_dissect.file.wal.header import WriteAheadLogHeader
 from sqlite_dissect.file.wal_index.header import WriteAheadLogIndexHeader
 
+try:
+    from mmap import MADV_WILLNEED
+except ImportError:
+    MADV_WILLNEED = None
+
 """
 
 file_handle.py
@@ -105,6 +111,18 @@ class FileHandle:
             self.file_object = file_identifier
             self.file_externally_controlled = True
 
+        """
+
+        Note:  If the file was opened here and the platform supports it, data is read with a single positional read
+               (pread) rather than a seek followed by a read.  Positional reads do not move the file position so they
+               are not used for externally controlled file objects that the caller may still be reading from.
+
+        """
+
+        self._positional_reads = not self.file_externally_controlled and hasattr(
+            os, "pread"
+        )
+
         if file_size:
             self.file_size = file_size
         else:
@@ -116,6 +134,40 @@ class FileHandle:
                 self.file_size = self.file_object.tell()
                 self.file_object.seek(0)
 
+        """
+
+        Note:  If the file was opened here, it is also memory mapped as read only so data can be sliced out of the
+               mapping rather than read with a system call each time.  The slices are copied out as bytes since the
+               data is parsed and decoded as bytes throughout the library.  If the file cannot be mapped (for example
+               if it is empty), reads fall back to positional reads or a seek followed by a read.
+
+               The mapping assumes the file size does not change while it is being parsed.  If another process
+               truncates the file after it is mapped, accessing the mapped pages past the new end of the file raises
+               a SIGBUS signal that terminates the process rather than an exception that can be handled.  Files being
+               analyzed should not be modified while they are parsed, and should be copied first if they are in use.
+
+               Where the platform supports it, the kernel is also advised the mapped file will be needed so it can
+               start reading it in ahead of the pages being parsed.  This is only a hint and is skipped if it fails.
+
+        """
+
+        self._file_map = None
+        if not self.file_externally_controlled and self.file_size:
+            try:
+                self._file_map = mmap(self.file_object.fileno(), 0, access=ACCESS_READ)
+            except (OSError, ValueError) as error:
+                log_message = "Unable to memory map the file: {} and reads will be done from the file instead: {}"
+                log_message = log_message.format(self.file_object.name, error)
+                self._logger.debug(log_message)
+            else:
+                if MADV_WILLNEED is not None:
+                    try:
+                        self._file_map.madvise(MADV_WILLNEED)
+                    except OSError as error:
+                        log_message = "Unable to advise the kernel the file: {} will be needed: {}"
+                        log_message = log_message.format(self.file_object.name, error)
+                        self._logger.debug(log_message)
+
         if self.file_type == FILE_TYPE.DATABASE:
 
             if self.file_size > LOCK_BYTE_PAGE_START_OFFSET:
@@ -270,6 +322,10 @@ class FileHandle:
 
             try:
 
+                if self._file_map is not None:
+                    self._file_map.close()
+                    self._file_map = None
+
                 self.file_object.close()
 
             except OSError:
@@ -280,6 +336,14 @@ class FileHandle:
 
     def read_data(self, offset, number_of_bytes):
 
+        if offset < 0 or number_of_bytes < 0:
+            log_message = (
+                "Requested offset: {} and length of data: {} must not be negative."
+            )
+            log_message = log_message.format(offset, number_of_bytes)
+            self._logger.error(log_message)
+            raise ValueError(log_message)
+
         if offset >= self.file_size:
             log_message = "Requested offset: {} is >= the file size: {}."
             log_message = log_message.format(offset, self.file_size)
@@ -296,6 +360,13 @@ class FileHandle:
 
         try:
 
+            if self._file_map is not None:
+                return self._file_map[offset : offset + int(number_of_bytes)]
+
+            # The file descriptor is retrieved on every read so a closed file raises a ValueError as below
+            if self._positional_reads:
+                return os.pread(self.file_object.fileno(), int(number_of_bytes), offset)
+
             self.file_object.seek(offset)
             return self.file_object.read(int(number_of_bytes))
 
@@ -226,12 +226,16 @@ class WriteAheadLogCommitRecord(Version):
 
         """
 
-        Here we setup the updated b-tree page numbers.  This array will be removed from as we parse through the file
-        to leave just the b-tree pages of the commit record that were updated at the end.
+        Here we setup the updated b-tree page numbers.  The updated page numbers that are not b-tree pages are
+        collected as we parse through the file and are taken out of the updated page numbers in a single pass at the
+        end to leave just the b-tree pages of the commit record that were updated.
+
+        Note:  Checks against the updated page numbers below are done against the frames dictionary since the updated
+               page numbers are the keys of the frames dictionary and the lookup does not have to scan a list.
 
         """
 
-        self.updated_b_tree_page_numbers = copy(self.updated_page_numbers)
+        non_b_tree_page_numbers = set()
 
         self.page_frame_index = dict.copy(page_frame_index)
         self.page_version_index = dict.copy(page_version_index)
@@ -319,10 +323,10 @@ class WriteAheadLogCommitRecord(Version):
 
         """
 
-        if SQLITE_MASTER_SCHEMA_ROOT_PAGE in self.updated_page_numbers:
+        if SQLITE_MASTER_SCHEMA_ROOT_PAGE in self.frames:
 
             # Remove it from the updated b-tree pages
-            self.updated_b_tree_page_numbers.remove(SQLITE_MASTER_SCHEMA_ROOT_PAGE)
+            non_b_tree_page_numbers.add(SQLITE_MASTER_SCHEMA_ROOT_PAGE)
 
             """
 
@@ -421,7 +425,7 @@ class WriteAheadLogCommitRecord(Version):
                 """
 
                 if last_master_schema_page_number != SQLITE_MASTER_SCHEMA_ROOT_PAGE:
-                    if last_master_schema_page_number in self.updated_page_numbers:
+                    if last_master_schema_page_number in self.frames:
                         self.master_schema_modified = True
                         break
 
@@ -558,11 +562,9 @@ class WriteAheadLogCommitRecord(Version):
             self._master_schema = MasterSchema(self, self._root_page)
 
             # Remove the master schema page numbers from the updated b-tree pages
-            for (
-                master_schema_page_number
-            ) in self._master_schema.master_schema_page_numbers:
-                if master_schema_page_number in self.updated_b_tree_page_numbers:
-                    self.updated_b_tree_page_numbers.remove(master_schema_page_number)
+            non_b_tree_page_numbers.update(
+                self._master_schema.master_schema_page_numbers
+            )
 
         """
 
@@ -621,12 +623,11 @@ class WriteAheadLogCommitRecord(Version):
             raise WalCommitRecordParsingError(log_message)
 
         for freelist_page_number in self.freelist_page_numbers:
-            if freelist_page_number in self.updated_page_numbers:
+            if freelist_page_number in self.frames:
                 self.freelist_pages_modified = True
 
                 # Remove the freelist page numbers from the updated b-tree pages
-                if freelist_page_number in self.updated_b_tree_page_numbers:
-                    self.updated_b_tree_page_numbers.remove(freelist_page_number)
+                non_b_tree_page_numbers.add(freelist_page_number)
 
         """
 
@@ -657,12 +658,17 @@ class WriteAheadLogCommitRecord(Version):
             self.pointer_map_page_numbers.append(pointer_map_page.number)
 
         for pointer_map_page_number in self.pointer_map_page_numbers:
-            if pointer_map_page_number in self.updated_page_numbers:
+            if pointer_map_page_number in self.frames:
                 self.pointer_map_pages_modified = True
 
                 # Remove the pointer map page numbers from the updated b-tree pages
-                if pointer_map_page_number in self.updated_b_tree_page_numbers:
-                    self.updated_b_tree_page_numbers.remove(pointer_map_page_number)
+                non_b_tree_page_numbers.add(pointer_map_page_number)
+
+        self.updated_b_tree_page_numbers = [
+            page_number
+            for page_number in self.updated_page_numbers
+            if page_number not in non_b_tree_page_numbers
+        ]
 
         """
 
@@ -185,8 +185,8 @@ class WriteAheadLogIndexSubHeader(SQLiteHeader):
             0
         ]
         self.change_counter = unpack(b"<I", wal_index_sub_header_byte_array[8:12])[0]
-        self.initialized = ord(wal_index_sub_header_byte_array[12:13])
-        self.checksums_in_big_endian = ord(wal_index_sub_header_byte_array[13:14])
+        self.initialized = wal_index_sub_header_byte_array[12]
+        self.checksums_in_big_endian = wal_index_sub_header_byte_array[13]
         self.page_size = unpack(b"<H", wal_index_sub_header_byte_array[14:16])[0]
         self.last_valid_frame_index = unpack(
             b"<I", wal_index_sub_header_byte_array[16:20]
@@ -1,7 +1,8 @@
 from binascii import hexlify
 from logging import getLogger
+from operator import attrgetter
 
-from sqlite_dissect.constants import LOGGER_NAME, PAGE_TYPE, UTF_8
+from sqlite_dissect.constants import LOGGER_NAME, PAGE_TYPE
 from sqlite_dissect.exception import OutputError
 from sqlite_dissect.file.database.page import (
     BTreePage,
@@ -10,7 +11,7 @@ from sqlite_dissect.file.database.page import (
     TableInteriorPage,
     TableLeafPage,
 )
-from sqlite_dissect.utilities import decode_str, has_content
+from sqlite_dissect.utilities import has_content
 
 """
 
@@ -206,57 +207,7 @@ def stringify_b_tree(version_interface, b_tree_root_page, padding=""):
 
 
 def stringify_cell_record(cell, database_text_encoding, page_type):
-    if page_type == PAGE_TYPE.B_TREE_TABLE_LEAF:
-
-        column_values = []
-        for record_column in cell.payload.record_columns:
-            text_affinity = (
-                True
-                if record_column.serial_type >= 13
-                and record_column.serial_type % 2 == 1
-                else False
-            )
-            value = record_column.value
-            if record_column.value:
-                if text_affinity:
-                    column_values.append(
-                        value.decode(database_text_encoding, "replace").encode(UTF_8)
-                    )
-                else:
-                    column_values.append(str(value))
-            else:
-                column_values.append("NULL")
-
-        content = "(" + ", ".join(list(map(decode_str, column_values))) + ")"
-        return f"#{cell.row_id}: {content}"
-
-    elif page_type == PAGE_TYPE.B_TREE_INDEX_LEAF:
-
-        column_values = []
-        for record_column in cell.payload.record_columns:
-            text_affinity = (
-                True
-                if record_column.serial_type >= 13
-                and record_column.serial_type % 2 == 1
-                else False
-            )
-            value = record_column.value
-            if record_column.value:
-                if text_affinity:
-                    column_values.append(
-                        value.decode(database_text_encoding, "replace").encode(UTF_8)
-                    )
-                else:
-                    column_values.append(str(value))
-            else:
-                column_values.append("NULL")
-
-        # Convert any binary strings into regular strings else it can't be joined properly
-        column_values = [decode_str(s) for s in column_values]
-        content = "(" + ", ".join(column_values) + ")"
-        return content
-
-    else:
+    if page_type not in (PAGE_TYPE.B_TREE_TABLE_LEAF, PAGE_TYPE.B_TREE_INDEX_LEAF):
         log_message = (
             "Invalid page type specified for stringify cell record: {}.  Page type should "
             "be either {} or {}."
@@ -267,6 +218,28 @@ def stringify_cell_record(cell, database_text_encoding, page_type):
         getLogger(LOGGER_NAME).error(log_message)
         raise ValueError(log_message)
 
+    # Text values are decoded straight to strings rather than round tripping them through UTF-8 encoded bytes
+    column_values = [
+        (
+            (
+                value.decode(database_text_encoding, "replace")
+                if serial_type >= 13 and serial_type & 1
+                else str(value)
+            )
+            if value
+            else "NULL"
+        )
+        for serial_type, value in map(
+            attrgetter("serial_type", "value"), cell.payload.record_columns
+        )
+    ]
+    content = "(" + ", ".join(column_values) + ")"
+
+    if page_type == PAGE_TYPE.B_TREE_TABLE_LEAF:
+        return f"#{cell.row_id}: {content}"
+
+    return content
+
 
 def stringify_cell_records(cells, database_text_encoding, page_type):
     cell_records = set()
@@ -0,0 +1,61 @@
+import pytest
+
+from sqlite_dissect.constants import Enum
+
+
+def test_enum_initialization():
+    # members can be accessed as both attributes and items
+    enum = Enum(["A", "B"])
+    assert enum.A == enum["A"] == "A"
+    assert len(enum) == 2
+    assert list(enum) == ["A", "B"]
+
+    # the dictionary sent in is copied rather than shared with the enumeration
+    data = {"A": 1}
+    enum = Enum(data)
+    data["A"] = 2
+    data["B"] = 3
+    assert enum.A == enum["A"] == 1
+    assert "B" not in enum
+
+    # anything other than a list or dictionary raises a ValueError
+    with pytest.raises(ValueError):
+        Enum("A")
+
+
+def test_enum_setitem_and_delitem():
+    enum = Enum({"A": 1})
+
+    # setting an item adds or updates both the item and the attribute
+    enum["A"] = 2
+    enum["B"] = 3
+    assert enum.A == enum["A"] == 2
+    assert enum.B == enum["B"] == 3
+
+    # deleting an item removes both the item and the attribute
+    del enum["B"]
+    assert "B" not in enum
+    with pytest.raises(KeyError):
+        _ = enum.B
+    with pytest.raises(KeyError):
+        _ = enum["B"]
+
+
+def test_enum_special_keys():
+    enum = Enum({"_private": 1, "keys": 2, 3: 4})
+
+    # underscore prefixed keys are not set as attributes but are still accessible
+    assert "_private" not in vars(enum)
+    assert enum._private == enum["_private"] == 1
+
+    # keys shadowing class attributes leave the class attribute in place and are accessible as items
+    assert list(enum.keys()) == ["_private", "keys", 3]
+    assert enum["keys"] == 2
+    enum["keys"] = 5
+    assert enum["keys"] == 5
+    assert callable(enum.keys)
+    del enum["keys"]
+    assert callable(enum.keys)
+
+    # non string keys are only accessible as items
+    assert enum[3] == 4
@@ -0,0 +1,182 @@
+from sqlite3 import OperationalError, ProgrammingError, connect
+from types import SimpleNamespace
+
+import pytest
+
+from sqlite_dissect.constants import PAGE_TYPE, UTF_8
+from sqlite_dissect.export.csv_export import CommitCsvExporter
+from sqlite_dissect.export.sqlite_export import CommitSqliteExporter
+
+
+class MockRecordColumn:
+    def __init__(self, serial_type, value):
+        self.serial_type = serial_type
+        self.value = value
+
+
+class MockCell:
+    def __init__(self, row_id, record_columns):
+        self.version_number = 0
+        self.page_version_number = 0
+        self.source = "Database"
+        self.page_number = 2
+        self.location = "B-Tree"
+        self.file_offset = 0
+        self.row_id = row_id
+        self.payload = SimpleNamespace(record_columns=record_columns)
+
+
+def text_column(text):
+    encoded = text.encode(UTF_8)
+    return MockRecordColumn(len(encoded) * 2 + 13, encoded)
+
+
+def test_csv_values_are_sanitized():
+    cells = [
+        (MockCell(1, [text_column("=1+1")]), "Added"),
+        (MockCell(2, [text_column("a\x00b\x1fc")]), "Added"),
+        (MockCell(3, [text_column(""), MockRecordColumn(1, 7)]), "Added"),
+    ]
+
+    rows = list(
+        CommitCsvExporter._get_cell_rows(
+            "Database", UTF_8, PAGE_TYPE.B_TREE_TABLE_LEAF, cells
+        )
+    )
+
+    # values starting with "=" are prefaced with a space to prevent formula injection
+    assert rows[0][-1] == " =1+1"
+
+    # NUL and C0 control characters are replaced with a space
+    assert rows[1][-1] == "a b c"
+
+    # empty text values and non text values are left as is
+    assert rows[2][-2:] == ["", 7]
+
+
+def test_sqlite_export_journal_mode(tmp_path):
+    with CommitSqliteExporter(str(tmp_path), "export.db3"):
+        pass
+
+    # the exported file should be left in the default rollback journal mode rather than write-ahead logging
+    connection = connect(str(tmp_path / "export.db3"))
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    connection.close()
+
+
+def test_sqlite_export_exit(tmp_path):
+    # writes are committed when the exporter exits cleanly
+    with CommitSqliteExporter(str(tmp_path), "clean.db3") as exporter:
+        exporter._cursor.execute("CREATE TABLE t (x)")
+
+    connection = connect(str(tmp_path / "clean.db3"))
+    assert connection.execute("SELECT name FROM sqlite_master").fetchall() == [("t",)]
+    connection.close()
+
+    # writes are rolled back and the connection is still closed when the exporter exits with an exception
+    with pytest.raises(RuntimeError):
+        with CommitSqliteExporter(str(tmp_path), "error.db3") as exporter:
+            exporter._cursor.execute("CREATE TABLE t (x)")
+            raise RuntimeError()
+
+    with pytest.raises(ProgrammingError):
+        exporter._connection.execute("SELECT 1")
+
+    connection = connect(str(tmp_path / "error.db3"))
+    assert connection.execute("SELECT name FROM sqlite_master").fetchall() == []
+    connection.close()
+
+
+class MockCommit:
+    def __init__(self, cells):
+        self.name = "t"
+        self.updated = True
+        self.page_type = PAGE_TYPE.B_TREE_TABLE_LEAF
+        self.file_type = "Database"
+        self.database_text_encoding = UTF_8
+        self.added_cells = {cell.row_id: cell for cell in cells}
+        self.updated_cells = {}
+        self.deleted_cells = {}
+        self.carved_cells = {}
+
+
+def test_sqlite_export_commit_interval(tmp_path, monkeypatch):
+    monkeypatch.setattr(CommitSqliteExporter, "_COMMIT_INTERVAL", 2)
+    master_schema_entry = SimpleNamespace(
+        name="t",
+        internal_schema_object=False,
+        column_definitions=[SimpleNamespace(column_name="x")],
+    )
+
+    # export more commit records than the commit interval so the batch is committed and started again
+    with CommitSqliteExporter(str(tmp_path), "export.db3") as exporter:
+        for row_id in range(5):
+            exporter.write_commit(
+                master_schema_entry,
+                MockCommit([MockCell(row_id, [MockRecordColumn(1, row_id)])]),
+            )
+        assert exporter._uncommitted_writes == 1
+
+    connection = connect(str(tmp_path / "export.db3"))
+    assert connection.execute("SELECT x FROM t").fetchall() == [
+        (row_id,) for row_id in range(5)
+    ]
+    connection.close()
+
+
+def test_sqlite_export_value_types(tmp_path):
+    master_schema_entry = SimpleNamespace(
+        name="t",
+        internal_schema_object=False,
+        column_definitions=[
+            SimpleNamespace(column_name="text_value"),
+            SimpleNamespace(column_name="blob_value"),
+        ],
+    )
+    blob = MockRecordColumn(2 * 3 + 12, b"\x00\x01\x02")
+
+    with CommitSqliteExporter(str(tmp_path), "export.db3") as exporter:
+        exporter.write_commit(
+            master_schema_entry, MockCommit([MockCell(1, [text_column("abc"), blob])])
+        )
+
+    # text affinity values are written as text and everything else as blobs
+    connection = connect(str(tmp_path / "export.db3"))
+    assert connection.execute(
+        "SELECT typeof(text_value), text_value, typeof(blob_value), blob_value FROM t"
+    ).fetchall() == [("text", "abc", "blob", b"\x00\x01\x02")]
+    connection.close()
+
+
+class BusyCursor:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def execute(self, statement, *args):
+        if statement == "BEGIN IMMEDIATE":
+            raise OperationalError("database is locked")
+        return self._cursor.execute(statement, *args)
+
+
+def test_sqlite_export_exit_without_transaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(CommitSqliteExporter, "_COMMIT_INTERVAL", 1)
+    master_schema_entry = SimpleNamespace(
+        name="t",
+        internal_schema_object=False,
+        column_definitions=[SimpleNamespace(column_name="x")],
+    )
+
+    # the original exception surfaces if starting the next batch fails after the previous batch was committed
+    with pytest.raises(OperationalError, match="database is locked"):
+        with CommitSqliteExporter(str(tmp_path), "export.db3") as exporter:
+            exporter._cursor = BusyCursor(exporter._cursor)
+            exporter.write_commit(
+                master_schema_entry, MockCommit([MockCell(1, [MockRecordColumn(1, 1)])])
+            )
+
+    connection = connect(str(tmp_path / "export.db3"))
+    assert connection.execute("SELECT x FROM t").fetchall() == [(1,)]
+    connection.close()
@@ -0,0 +1,45 @@
+from os.path import join
+from struct import pack, unpack
+
+import pytest
+
+from sqlite_dissect.file.database.database import Database
+from sqlite_dissect.tests.constants import DB_FILES
+
+
+@pytest.mark.parametrize("version_valid_for_changed", [False, True])
+def test_database_size_in_pages_with_partial_page(tmp_path, version_valid_for_changed):
+    with open(join(DB_FILES, "chinook.sqlite"), "rb") as database_file:
+        database = bytearray(database_file.read())
+    page_size = unpack(">H", database[16:18])[0]
+    database_size_in_pages = len(database) // page_size
+
+    # changing the version valid for number forces the size in pages to be calculated from the file size
+    if version_valid_for_changed:
+        version_valid_for_number = unpack(">I", database[92:96])[0]
+        database[92:96] = pack(">I", version_valid_for_number + 1)
+
+    # append a partial page to the end of the database file
+    database_file_name = tmp_path / "chinook.sqlite"
+    database_file_name.write_bytes(database + b"\x00" * 100)
+
+    with pytest.warns(RuntimeWarning, match="not a multiple of the page size"):
+        database = Database(str(database_file_name))
+
+    assert isinstance(database.database_size_in_pages, int)
+    assert database.database_size_in_pages == database_size_in_pages
+
+
+def test_get_page_data_page_number():
+    database = Database(join(DB_FILES, "chinook.sqlite"))
+
+    # the page data is read from the same offset get_page_offset calculates
+    page_number = database.database_size_in_pages
+    assert database.get_page_data(page_number, 10, 4) == database.file_handle.read_data(
+        database.get_page_offset(page_number) + 10, 4
+    )
+
+    # page numbers outside of the database raise a value error
+    for invalid_page_number in (0, database.database_size_in_pages + 1):
+        with pytest.raises(ValueError):
+            database.get_page_data(invalid_page_number)
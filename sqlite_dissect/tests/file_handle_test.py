@@ -2,6 +2,7 @@ import os
 
 import pytest
 
+import sqlite_dissect.file.file_handle as file_handle_module
 from sqlite_dissect.constants import (
     FILE_TYPE,
     UTF_8,
@@ -251,3 +252,69 @@ def test_read_data(file_handle, offset, number_of_bytes, expected):
     else:
         file_handle.read_data(offset, number_of_bytes)
         assert True
+
+
+def unmappable(*args, **kwargs):
+    raise OSError("Unable to map the file")
+
+
+@pytest.mark.parametrize("positional_reads", [True, False])
+def test_read_data_without_memory_map(monkeypatch, positional_reads):
+    monkeypatch.setattr(file_handle_module, "mmap", unmappable)
+    file_name = os.path.join(DB_FILES, "chinook.sqlite")
+    file_handle = FileHandle(FILE_TYPE.DATABASE, file_name, None, None)
+    file_handle._positional_reads = positional_reads
+
+    # reads fall back to positional reads or a seek followed by a read if the file could not be mapped
+    assert file_handle._file_map is None
+    with open(file_name, "rb") as file_object:
+        file_object.seek(100)
+        assert file_handle.read_data(100, 50) == file_object.read(50)
+
+    # reading after the file handle is closed raises a value error
+    file_handle.close()
+    with pytest.raises(ValueError):
+        file_handle.read_data(100, 50)
+
+
+def test_read_data_memory_map_closed():
+    file_handle = FileHandle(
+        FILE_TYPE.DATABASE, os.path.join(DB_FILES, "chinook.sqlite"), None, None
+    )
+    assert file_handle._file_map is not None
+    file_handle.close()
+    assert file_handle._file_map is None
+
+    # reading after the file handle is closed raises a value error rather than reading the closed memory map
+    with pytest.raises(ValueError):
+        file_handle.read_data(0, 1)
+
+
+def test_empty_file_not_memory_mapped(monkeypatch):
+    mapped_files = []
+    monkeypatch.setattr(
+        file_handle_module, "mmap", lambda *args, **kwargs: mapped_files.append(args)
+    )
+
+    # empty files cannot be memory mapped so they are not attempted
+    with pytest.raises(ValueError):
+        FileHandle(
+            FILE_TYPE.WAL, os.path.join(DB_FILES, "invalid_wal.sqlite-wal"), None, None
+        )
+    assert mapped_files == []
+
+
+@pytest.mark.parametrize("memory_mapped", [True, False])
+@pytest.mark.parametrize("offset, number_of_bytes", [(-10, 5), (10, -5)])
+def test_read_data_negative(monkeypatch, memory_mapped, offset, number_of_bytes):
+    if not memory_mapped:
+        monkeypatch.setattr(file_handle_module, "mmap", unmappable)
+    file_handle = FileHandle(
+        FILE_TYPE.DATABASE, os.path.join(DB_FILES, "chinook.sqlite"), None, None
+    )
+    assert (file_handle._file_map is not None) == memory_mapped
+
+    # negative offsets or lengths raise a value error rather than reading from the end of the file
+    with pytest.raises(ValueError):
+        file_handle.read_data(offset, number_of_bytes)
+    file_handle.close()
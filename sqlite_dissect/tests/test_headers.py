@@ -6,7 +6,11 @@ import pytest
 
 from sqlite_dissect.constants import *
 from sqlite_dissect.exception import HeaderParsingError
-from sqlite_dissect.file.database.header import DatabaseHeader
+from sqlite_dissect.file.database.header import (
+    DatabaseHeader,
+    InteriorPageHeader,
+    LeafPageHeader,
+)
 from sqlite_dissect.file.journal.header import RollbackJournalHeader
 from sqlite_dissect.file.wal.header import WriteAheadLogFrameHeader, WriteAheadLogHeader
 from sqlite_dissect.file.wal_index.header import (
@@ -517,3 +521,53 @@ def test_journal_header_init(rollback_journal_header_byte_array, expected_value)
         assert journal_header.md5_hex_digest == get_md5_hash(
             rollback_journal_header_byte_array
         )
+
+
+def test_b_tree_page_header_md5_hex_digest():
+    # a table leaf page with no cells followed by the rest of the page
+    page = b"\x0D\x00\x00\x00\x00\x04\x00\x00" + b"\x01" * 1016
+    header = LeafPageHeader(page)
+
+    # the digest is calculated from the header bytes on the first access and then cached
+    expected_digest = md5(page[:8]).hexdigest().upper()
+    assert header.md5_hex_digest == expected_digest
+    assert header._header_byte_array is None
+    assert header.md5_hex_digest == expected_digest
+
+
+def test_b_tree_page_header_slots():
+    with open(os.path.join(DB_FILES, "chinook.sqlite"), "rb") as db_file:
+        root_page = db_file.read(1024)
+    leaf_page = b"\x0D\x00\x00\x00\x00\x04\x00\x00" + b"\x00" * 1016
+    interior_page = b"\x05\x00\x00\x00\x02\x03\xF0\x00\x00\x00\x00\x07" + b"\x00" * 1012
+
+    leaf_header = LeafPageHeader(leaf_page)
+    interior_header = InteriorPageHeader(interior_page)
+    root_header = InteriorPageHeader(root_page)
+
+    # the fields are accessible as attributes on both the leaf and interior page headers
+    assert leaf_header.page_type == b"\x0D"
+    assert leaf_header.offset == 0
+    assert leaf_header.header_length == 8
+    assert leaf_header.cell_content_offset == 1024
+    assert interior_header.page_type == b"\x05"
+    assert interior_header.header_length == 12
+    assert interior_header.number_of_cells_on_page == 2
+    assert interior_header.cell_content_offset == 1008
+    assert interior_header.right_most_pointer == 7
+    assert root_header.contains_sqlite_database_header
+    assert root_header.offset == 100
+    assert root_header.page_type == b"\x05"
+    assert root_header.root_page_only_md5_hex_digest == get_md5_hash(root_page[100:])
+
+    # only the interior page header stringifies the right most pointer
+    assert "Page Type (Hex): b'0d'" in leaf_header.stringify()
+    assert "Right Most Pointer" not in leaf_header.stringify()
+    assert interior_header.stringify("\t").endswith("\n\tRight Most Pointer: 7")
+    assert "\n" not in str(interior_header)
+
+    # slotted headers no longer have an instance dictionary so undeclared attributes cannot be set
+    for header in (leaf_header, interior_header, root_header):
+        assert not hasattr(header, "__dict__")
+        with pytest.raises(AttributeError):
+            header.undeclared_attribute = None
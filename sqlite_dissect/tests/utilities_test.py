@@ -164,6 +164,12 @@ class TestRootUtilities(unittest.TestCase):
             result = has_content(case)
             self.assertEqual(True, result)
 
+        # Test empty input and bytes as well as bytearrays
+        self.assertEqual(False, has_content(bytearray()))
+        self.assertEqual(False, has_content(b""))
+        self.assertEqual(False, has_content(b"\x00\x00"))
+        self.assertEqual(True, has_content(b"\x00\x30"))
+
 
 # Begin pytest tests
 def test_decode_varint():
@@ -5,14 +5,12 @@ from hashlib import md5
 from logging import getLogger
 from os import makedirs, path, walk
 from os.path import exists, isdir, join
-from re import compile
 from struct import pack, unpack
 
 from configargparse import ArgParser
 
 from sqlite_dissect._version import __version__
 from sqlite_dissect.constants import (
-    ALL_ZEROS_REGEX,
     BLOB_SIGNATURE_IDENTIFIER,
     LOGGER_NAME,
     MAGIC_HEADER_STRING,
@@ -262,10 +260,8 @@ def get_serial_type_signature(serial_type):
 
 
 def has_content(byte_array):
-    pattern = compile(ALL_ZEROS_REGEX)
-    if pattern.match(hexlify(byte_array)):
-        return False
-    return True
+    # The byte array has content if any byte in it is not zero
+    return any(byte_array)
 
 
 def is_sqlite_file(path: str) -> bool: